@@ -0,0 +1,13 @@
+from audit.registry import audit_registry
+from approval.models import BaseApprovableModel
+
+# The workflow toggles approval_status/is_active on every transition; the
+# decision itself is already recorded on the ApprovalTask rows.
+audit_registry.register(BaseApprovableModel, bookkeeping_fields=("approval_status", "is_active"))
+audit_registry.register_label(
+    "approval.ApproverGroupUser",
+    lambda member: f"group #{member.approver_group_id} - profile #{member.user_id}",
+)
+audit_registry.register_label("approval.ApprovalTask", lambda task: f"#{task.pk} ({task.status})")
+# Read models derived from membership and task status, which are audited themselves
+audit_registry.skip("approval.ApproverIndex", "approval.ApprovalInboxEntry")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from approval.models import ApproverIndex
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the approver index of approval document levels from groups, members and roles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--level',
+            type=int,
+            action='append',
+            dest='levels',
+            help='Only rebuild this level id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        levels = options['levels']
+        self.stdout.write("Rebuilding approver index...")
+
+        ApproverIndex.rebuild(levels)
+
+        self.stdout.write(self.style.SUCCESS(f'Approver index now holds {ApproverIndex.objects.count()} row(s).'))
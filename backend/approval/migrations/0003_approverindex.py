@@ -0,0 +1,51 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_approver_index(apps, schema_editor):
+    ApproverIndex = apps.get_model('approval', 'ApproverIndex')
+    links = (
+        ('approver', apps.get_model('approval', 'ApprovalDocumentLevelApprovers')),
+        ('overrider', apps.get_model('approval', 'ApprovalDocumentLevelOverriders')),
+    )
+    rows = set()
+    for kind, link_model in links:
+        for user_path in ('approver_group__users__user', 'approver_group__roles__user_roles__user'):
+            rows.update(
+                (level_id, user_id, kind)
+                for level_id, user_id in link_model.objects.filter(
+                    **{f'{user_path}__isnull': False}
+                ).values_list('approval_document_level_id', user_path)
+            )
+    ApproverIndex.objects.bulk_create(
+        [ApproverIndex(level_id=level_id, user_id=user_id, kind=kind) for level_id, user_id, kind in rows],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approval', '0002_initial'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApproverIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('approver', 'Approver'), ('overrider', 'Overrider')], max_length=10)),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approver_index', to='approval.approvaldocumentlevel')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approver_index', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'kind', 'level'], name='approverindex_user_kind_idx')],
+                'unique_together': {('level', 'user', 'kind')},
+            },
+        ),
+        migrations.RunPython(populate_approver_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_approval_inbox(apps, schema_editor):
+    ApprovalTask = apps.get_model('approval', 'ApprovalTask')
+    ApproverIndex = apps.get_model('approval', 'ApproverIndex')
+    ApprovalInboxEntry = apps.get_model('approval', 'ApprovalInboxEntry')
+
+    approvers = {}
+    for level_id, user_id in ApproverIndex.objects.filter(kind='approver').values_list('level_id', 'user_id'):
+        approvers.setdefault(level_id, []).append(user_id)
+
+    entries = []
+    for task_id, level_id, task_status, updated_at, institution_id in ApprovalTask.objects.filter(
+        status__in=('not_started', 'pending'), approval__status='ongoing'
+    ).values_list('id', 'level_id', 'status', 'updated_at', 'approval__document__institution_id').iterator():
+        for user_id in approvers.get(level_id, ()):
+            entries.append(ApprovalInboxEntry(
+                user_id=user_id,
+                approval_task_id=task_id,
+                status=task_status,
+                became_pending_at=updated_at if task_status == 'pending' else None,
+                institution_id=institution_id,
+            ))
+    ApprovalInboxEntry.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approval', '0003_approverindex'),
+        ('institution', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalInboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('not_started', 'Not Started'), ('pending', 'Pending'), ('rejected', 'Rejected'), ('approved', 'Approved'), ('terminated', 'Terminated'), ('overridden', 'Overridden')], max_length=20)),
+                ('became_pending_at', models.DateTimeField(blank=True, null=True)),
+                ('approval_task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='approval.approvaltask')),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='approval_inbox_entries', to='institution.institution')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_inbox', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'status', 'became_pending_at'], name='inbox_user_status_age_idx')],
+                'unique_together': {('user', 'approval_task')},
+            },
+        ),
+        migrations.RunPython(populate_approval_inbox, migrations.RunPython.noop),
+    ]
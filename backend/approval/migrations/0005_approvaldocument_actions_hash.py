@@ -0,0 +1,48 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def populate_actions_hash(apps, schema_editor):
+    ApprovalDocument = apps.get_model('approval', 'ApprovalDocument')
+    Through = ApprovalDocument.actions.through
+
+    action_ids = {}
+    for document_id, action_id in Through.objects.values_list('approvaldocument_id', 'action_id').iterator():
+        action_ids.setdefault(document_id, set()).add(action_id)
+
+    seen = set()
+    documents = []
+    for document in ApprovalDocument.objects.order_by('id').only('id', 'institution_id', 'content_type_id'):
+        ids = sorted(action_ids.get(document.id, ()))
+        if not ids:
+            continue
+        actions_hash = hashlib.sha256(",".join(map(str, ids)).encode()).hexdigest()
+        key = (document.institution_id, document.content_type_id, actions_hash)
+        # Duplicates saved before the check covered creation keep no hash, the oldest document wins
+        if key in seen:
+            continue
+        seen.add(key)
+        document.actions_hash = actions_hash
+        documents.append(document)
+    ApprovalDocument.objects.bulk_update(documents, ['actions_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approval', '0004_approvalinboxentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='approvaldocument',
+            name='actions_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(populate_actions_hash, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='approvaldocument',
+            constraint=models.UniqueConstraint(fields=('institution', 'content_type', 'actions_hash'), name='unique_approval_document_actions'),
+        ),
+    ]
@@ -1,15 +1,17 @@
 from django.db import models
-from communication.views import add_notification
+from communication.views import add_notification, add_notifications
 from utilities.utility_base_model import SoftDeletableTimeStampedModel
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+import hashlib
 import uuid
 from django.db import transaction
 from rest_framework.exceptions import ValidationError
 from django.utils import timezone
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
-from django.db.models import Q
+from django.core.cache import cache
+from utilities.generic_relations import prefetch_generic_foreign_key
 
 
 
@@ -67,24 +69,48 @@ class ApprovalDocument(SoftDeletableTimeStampedModel):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     description = models.TextField(blank=True, null=True)
     actions = models.ManyToManyField('Action', related_name='approval_documents', blank=True)
+    # sha256 of the sorted action ids, kept in sync by approval.signals; null while there are no actions
+    actions_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['institution', 'content_type', 'actions_hash'],
+                name='unique_approval_document_actions',
+            ),
+        ]
 
     def str(self):
         return f"Approval Document for {self.content_type}"
 
+    @staticmethod
+    def compute_actions_hash(action_ids):
+        action_ids = sorted(set(action_ids))
+        if not action_ids:
+            return None
+        return hashlib.sha256(",".join(map(str, action_ids)).encode()).hexdigest()
+
+    def has_duplicate_actions(self, actions_hash=None) -> bool:
+        """Whether another document of the institution and content type has the same actions."""
+        actions_hash = actions_hash or self.actions_hash
+        if actions_hash is None:
+            return False
+        return ApprovalDocument.objects.filter(
+            institution_id=self.institution_id,
+            content_type_id=self.content_type_id,
+            actions_hash=actions_hash
+        ).exclude(pk=self.pk).exists()
+
     def clean(self):
         super().clean()
-        if self.pk:  
-            current_actions = set(self.actions.values_list('id', flat=True))
-            
-            for doc in ApprovalDocument.objects.filter(
-                institution=self.institution,
-                content_type=self.content_type
-            ).exclude(pk=self.pk):
-                doc_actions = set(doc.actions.values_list('id', flat=True))
-                if current_actions == doc_actions:
-                    raise ValidationError(
-                        {"error":"An approval document with the same content type and actions already exists."}
-                    )
+        if self.pk:
+            if self.actions_hash is None:
+                # Left unset while .set() swapped the actions, settle it now
+                self.actions_hash = self.compute_actions_hash(self.actions.values_list('id', flat=True))
+            if self.has_duplicate_actions():
+                raise ValidationError(
+                    {"error":"An approval document with the same content type and actions already exists."}
+                )
 
     def save(self, *args, **kwargs):
         self.full_clean()
@@ -109,37 +135,21 @@ class ApprovalDocumentLevel(SoftDeletableTimeStampedModel):
         ordering = ['level']
 
     def get_approver_users(self) -> set:
-        """Get all unique users who are approvers for this level (direct users + via roles)"""
-        from users.models import CustomUser, Profile, Role  # Import as needed
-        
-        users = set()
-        
-        for group in self.approvers.all():
-            # Direct users in group
-            for profile in group.users.all():
-                if profile.user and profile.user.is_active:
-                    users.add(profile.user)
-            
-            # Users via roles in group
-            for role in group.roles.all():
-                for user_role in role.user_roles.all():  
-                    if user_role.user and user_role.user.is_active:
-                        users.add(user_role.user)
-        
-        return users   
+        """Get all unique active users who are approvers for this level (direct users + via roles)"""
+        return self._get_indexed_users(ApproverIndex.KIND_APPROVER)
 
-    def get_overriders(self) -> set: 
-        users = set()
-        for group in self.overriders.all():
-            for profile in group.users.all():
-                if profile.user and profile.user.is_active:
-                    users.add(profile.user)
+    def get_overriders(self) -> set:
+        """Get all unique active users who can override this level"""
+        return self._get_indexed_users(ApproverIndex.KIND_OVERRIDER)
 
-            for role in group.roles.all():        
-                for user_role in role.user_roles.all():  
-                    if user_role.user and user_role.user.is_active:
-                        users.add(user_role.user)
-        return users                
+    def _get_indexed_users(self, kind) -> set:
+        from users.models import CustomUser
+
+        return set(CustomUser.objects.filter(
+            approver_index__level=self,
+            approver_index__kind=kind,
+            is_active=True,
+        ))
 
 @receiver(pre_save, sender=ApprovalDocumentLevel)
 def set_approval_level(sender, instance, **kwargs):
@@ -167,6 +177,89 @@ class ApprovalDocumentLevelOverriders(models.Model):
         verbose_name = "Approval Document Level Overrider"
         verbose_name_plural = "Approval Document Level Overriders"
 
+class ApproverIndex(models.Model):
+    """
+    Denormalized (level, user, kind) rows resolving who can approve or
+    override a level, directly or through a role, with one indexed query.
+    Kept up to date by approval.signals; rebuild it with
+    `manage.py rebuild_approver_index`.
+    """
+    KIND_APPROVER = 'approver'
+    KIND_OVERRIDER = 'overrider'
+    KIND_CHOICES = [
+        (KIND_APPROVER, 'Approver'),
+        (KIND_OVERRIDER, 'Overrider'),
+    ]
+
+    level = models.ForeignKey(ApprovalDocumentLevel, on_delete=models.CASCADE, related_name='approver_index')
+    user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='approver_index')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+
+    class Meta:
+        unique_together = ('level', 'user', 'kind')
+        indexes = [
+            models.Index(fields=['user', 'kind', 'level'], name='approverindex_user_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.user_id} on level {self.level_id}"
+
+    @classmethod
+    def get_user_ids(cls, level_id, kind=KIND_APPROVER) -> list:
+        """Ids of the active users who can act on a level."""
+        return list(cls.objects.filter(
+            level_id=level_id, kind=kind, user__is_active=True
+        ).values_list('user_id', flat=True))
+
+    @classmethod
+    def rebuild(cls, level_ids=None):
+        """
+        Recompute the rows of the given levels, or of every level when
+        level_ids is None. Only the differences are written.
+        """
+        if level_ids is not None:
+            level_ids = set(level_ids)
+            if not level_ids:
+                return
+
+        desired = set()
+        for kind, link_model in (
+            (cls.KIND_APPROVER, ApprovalDocumentLevelApprovers),
+            (cls.KIND_OVERRIDER, ApprovalDocumentLevelOverriders),
+        ):
+            links = link_model.objects.all()
+            if level_ids is not None:
+                links = links.filter(approval_document_level_id__in=level_ids)
+            # Members of the group, then holders of the group's roles
+            for user_path in ('approver_group__users__user', 'approver_group__roles__user_roles__user'):
+                rows = links.filter(**{f'{user_path}__isnull': False}).values_list(
+                    'approval_document_level_id', user_path
+                )
+                desired.update((level_id, user_id, kind) for level_id, user_id in rows)
+
+        existing = cls.objects.all()
+        if level_ids is not None:
+            existing = existing.filter(level_id__in=level_ids)
+        current = {
+            (level_id, user_id, kind): pk
+            for pk, level_id, user_id, kind in existing.values_list('id', 'level_id', 'user_id', 'kind')
+        }
+
+        stale = [key for key in current if key not in desired]
+        if stale:
+            cls.objects.filter(id__in=[current[key] for key in stale]).delete()
+        missing = desired - current.keys()
+        if missing:
+            cls.objects.bulk_create(
+                [cls(level_id=level_id, user_id=user_id, kind=kind) for level_id, user_id, kind in missing],
+                ignore_conflicts=True,
+            )
+
+        # Approver inboxes follow the approvers of each level
+        changed_levels = {key[0] for key in stale if key[2] == cls.KIND_APPROVER}
+        changed_levels.update(key[0] for key in missing if key[2] == cls.KIND_APPROVER)
+        ApprovalInboxEntry.sync_levels(changed_levels)
+
 class Approval(models.Model):
     STATUS_CHOICES = [
         ('ongoing', 'Ongoing'),
@@ -211,13 +304,9 @@ class ApprovalTask(SoftDeletableTimeStampedModel):
 
     def _check_user_is_approver(self, user):
         """Check if user is authorized as an approver for this level"""
-        profile = user.profile
-        user_roles = user.roles.all()
-        approver_groups = self.level.approvers.filter(
-            Q(users=profile) | Q(roles__in=user_roles)
-        ).distinct()
-        
-        if not approver_groups.exists():
+        if not ApproverIndex.objects.filter(
+            level_id=self.level_id, user=user, kind=ApproverIndex.KIND_APPROVER
+        ).exists():
             raise ValidationError({
                 "error": "User is not authorized to approve/reject tasks at this level"
             })
@@ -226,13 +315,9 @@ class ApprovalTask(SoftDeletableTimeStampedModel):
 
     def _check_user_is_overrider(self, user):
         """Check if user is authorized as an overrider for this level"""
-        profile = user.profile
-        user_roles = user.roles.all()
-        overrider_groups = self.level.overriders.filter(
-            Q(users=profile) | Q(roles__in=user_roles)
-        ).distinct()
-        
-        if not overrider_groups.exists():
+        if not ApproverIndex.objects.filter(
+            level_id=self.level_id, user=user, kind=ApproverIndex.KIND_OVERRIDER
+        ).exists():
             raise ValidationError({
                 "error": "User is not authorized to override tasks at this level"
             })
@@ -378,6 +463,145 @@ class ApprovalTask(SoftDeletableTimeStampedModel):
                     object_id=object_id
                 )
 
+    BULK_ACTIONS = {
+        'approve': ('approved', ApproverIndex.KIND_APPROVER),
+        'reject': ('rejected', ApproverIndex.KIND_APPROVER),
+        'override': ('overridden', ApproverIndex.KIND_OVERRIDER),
+    }
+
+    @classmethod
+    def bulk_transition(cls, user, task_ids, action, comment: str = None) -> dict:
+        """
+        Approve, reject or override many tasks in one transaction.
+
+        The user's rights are resolved once for all the levels involved,
+        tasks and approvals are written with batched updates, and each
+        recipient gets a single notification however many of their items
+        moved. Returns {task_id: {"status": ...} or {"error": ...}}; tasks
+        that fail validation are reported and skipped, the others applied.
+        """
+        new_status, kind = cls.BULK_ACTIONS[action]
+        from audit.signals import log_bulk_update
+
+        results = {}
+        now = timezone.now()
+        with transaction.atomic():
+            tasks = {
+                task.id: task
+                for task in cls.objects.select_for_update(of=('self', 'approval')).select_related(
+                    'level', 'approval__action', 'approval__content_type'
+                ).filter(id__in=task_ids)
+            }
+            allowed_levels = set(ApproverIndex.objects.filter(
+                user=user, kind=kind, level_id__in={task.level_id for task in tasks.values()}
+            ).values_list('level_id', flat=True))
+
+            accepted, seen_approvals = [], set()
+            for task_id in task_ids:
+                task = tasks.get(task_id)
+                if task is None:
+                    results[task_id] = {'error': 'Task not found'}
+                elif task.status != 'pending':
+                    results[task_id] = {'error': 'Task must be in pending state'}
+                elif task.level_id not in allowed_levels:
+                    results[task_id] = {'error': f'User is not authorized to {action} tasks at this level'}
+                elif task.approval_id in seen_approvals:
+                    results[task_id] = {'error': 'Another task of this approval is already part of the request'}
+                else:
+                    seen_approvals.add(task.approval_id)
+                    accepted.append(task)
+            if not accepted:
+                return results
+
+            for task in accepted:
+                task.status = new_status
+                task.approved_by = user
+                if comment:
+                    task.comment = comment
+                task.updated_at = now
+            cls.objects.bulk_update(accepted, ['status', 'updated_at', 'comment', 'approved_by'])
+            log_bulk_update(cls, accepted, ['status', 'updated_at', 'comment', 'approved_by'])
+
+            # Remaining open tasks of the approvals involved, by approval and level number
+            open_tasks = {}
+            for other in cls.objects.filter(
+                approval_id__in=seen_approvals, status__in=['not_started', 'pending']
+            ).select_related('level'):
+                open_tasks.setdefault(other.approval_id, {})[other.level.level] = other
+
+            advanced, finished, terminated_ids = [], [], []
+            for task in accepted:
+                remaining = open_tasks.get(task.approval_id, {})
+                next_task = remaining.get(task.level.level + 1) if new_status == 'approved' else None
+                if next_task is not None:
+                    next_task.status = 'pending'
+                    next_task.updated_at = now
+                    advanced.append((task, next_task))
+                    continue
+                task.approval.status = 'rejected' if new_status == 'rejected' else 'completed'
+                finished.append(task)
+                if new_status != 'approved':
+                    terminated_ids.extend(other.id for other in remaining.values())
+
+            if advanced:
+                next_tasks = [next_task for _task, next_task in advanced]
+                cls.objects.bulk_update(next_tasks, ['status', 'updated_at'])
+                log_bulk_update(cls, next_tasks, ['status', 'updated_at'])
+            if terminated_ids:
+                cls.objects.filter(id__in=terminated_ids).update(status='terminated')
+            if finished:
+                approvals = [task.approval for task in finished]
+                Approval.objects.bulk_update(approvals, ['status'])
+                log_bulk_update(Approval, approvals, ['status'])
+
+            # Content objects, one query per content type
+            content_objects = prefetch_generic_foreign_key([task.approval for task in accepted])
+
+            next_approvers = {}
+            if advanced:
+                for level_id, user_id in ApproverIndex.objects.filter(
+                    level_id__in={next_task.level_id for _task, next_task in advanced},
+                    kind=ApproverIndex.KIND_APPROVER, user__is_active=True
+                ).values_list('level_id', 'user_id'):
+                    next_approvers.setdefault(level_id, []).append(user_id)
+
+            notifications = {}
+            for task, next_task in advanced:
+                content_object = content_objects.get((task.approval.content_type_id, task.approval.object_id))
+                object_desc = str(content_object) if content_object else "an object"
+                message = f"A new approval task is pending for you: Approve {object_desc} at level {next_task.level.level}."
+                for approver_id in next_approvers.get(next_task.level_id, ()):
+                    notifications.setdefault(approver_id, []).append(
+                        (message, task.approval.content_type.model, str(task.approval.object_id))
+                    )
+
+            for task in finished:
+                content_object = content_objects.get((task.approval.content_type_id, task.approval.object_id))
+                if content_object:
+                    content_object.finish_workflow(task.approval)
+                creator_id = getattr(content_object, 'created_by_id', None)
+                if not creator_id:
+                    continue
+                object_desc = str(content_object)
+                if new_status == 'approved':
+                    message = f"Your {content_object._meta.verbose_name} has been approved."
+                elif new_status == 'rejected':
+                    message = f"Your approval request for {object_desc} has been rejected at level {task.level.level}."
+                else:
+                    message = f"Your approval request for {object_desc} has been overridden and completed at level {task.level.level}."
+                notifications.setdefault(creator_id, []).append(
+                    (message, task.approval.content_type.model, str(task.approval.object_id))
+                )
+
+            touched = [task.id for task in accepted] + [next_task.id for _task, next_task in advanced] + terminated_ids
+            ApprovalInboxEntry.sync_tasks(touched)
+            invalidate_approval_dashboards([user.id])
+            transaction.on_commit(lambda: send_coalesced_notifications(notifications))
+
+            for task in accepted:
+                results[task.id] = {'status': new_status}
+        return results
+
     def can_user_approve_or_reject(self, user):
         """Check if user can approve or reject this task"""
         try:
@@ -409,6 +633,135 @@ class ApprovalTask(SoftDeletableTimeStampedModel):
             'is_institution_owner': is_institution_owner
         }
 
+def send_coalesced_notifications(notifications) -> None:
+    """
+    Send {user_id: [(message, model_name, object_id), ...]}: a user with a
+    single item gets it as is, a user with several gets one summary.
+    Recipients of identical notifications share a Redis round-trip.
+    """
+    grouped = {}
+    for user_id, items in notifications.items():
+        if len(items) > 1:
+            items = [(f"You have {len(items)} new approval updates.", None, None)]
+        grouped.setdefault(items[0], []).append(user_id)
+    for (message, model_name, object_id), user_ids in grouped.items():
+        add_notifications(user_ids, message, model_name=model_name, object_id=object_id)
+
+
+def get_dashboard_cache_key(user_id) -> str:
+    return f"approval_dashboard:{user_id}"
+
+
+def invalidate_approval_dashboards(user_ids) -> None:
+    """Drop the cached dashboard counts of users whose tasks changed, now and on commit."""
+    keys = [get_dashboard_cache_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class ApprovalInboxEntry(models.Model):
+    """
+    Read model of the approval tasks waiting on each approver: one row per
+    (user, open task of an ongoing approval). Kept in sync by
+    approval.signals and ApproverIndex.rebuild so the inbox endpoints read
+    a single index range instead of resolving roles and groups.
+    """
+    OPEN_STATUSES = ('not_started', 'pending')
+
+    user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='approval_inbox')
+    approval_task = models.ForeignKey(ApprovalTask, on_delete=models.CASCADE, related_name='inbox_entries')
+    status = models.CharField(max_length=20, choices=ApprovalTask.STATUS_CHOICES)
+    became_pending_at = models.DateTimeField(null=True, blank=True)
+    institution = models.ForeignKey(
+        'institution.Institution', on_delete=models.CASCADE, null=True, blank=True, related_name='approval_inbox_entries'
+    )
+
+    class Meta:
+        unique_together = ('user', 'approval_task')
+        indexes = [
+            models.Index(fields=['user', 'status', 'became_pending_at'], name='inbox_user_status_age_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.approval_task_id} for user {self.user_id} ({self.status})"
+
+    @classmethod
+    def sync_tasks(cls, task_ids):
+        """Bring the inbox rows of the given tasks in line with their status and approvers."""
+        task_ids = set(task_ids)
+        if not task_ids:
+            return
+
+        open_tasks = {
+            task_id: (level_id, task_status, updated_at, institution_id)
+            for task_id, level_id, task_status, updated_at, institution_id in ApprovalTask.objects.filter(
+                id__in=task_ids, status__in=cls.OPEN_STATUSES, approval__status='ongoing'
+            ).values_list('id', 'level_id', 'status', 'updated_at', 'approval__document__institution_id')
+        }
+        approvers = {}
+        for level_id, user_id in ApproverIndex.objects.filter(
+            level_id__in={task[0] for task in open_tasks.values()}, kind=ApproverIndex.KIND_APPROVER
+        ).values_list('level_id', 'user_id'):
+            approvers.setdefault(level_id, []).append(user_id)
+
+        existing = {
+            (user_id, task_id): (pk, entry_status, became_pending_at)
+            for pk, user_id, task_id, entry_status, became_pending_at in cls.objects.filter(
+                approval_task_id__in=task_ids
+            ).values_list('id', 'user_id', 'approval_task_id', 'status', 'became_pending_at')
+        }
+
+        to_create, to_update, wanted = [], [], set()
+        for task_id, (level_id, task_status, updated_at, institution_id) in open_tasks.items():
+            for user_id in approvers.get(level_id, ()):
+                wanted.add((user_id, task_id))
+                current = existing.get((user_id, task_id))
+                if current is None:
+                    to_create.append(cls(
+                        user_id=user_id,
+                        approval_task_id=task_id,
+                        status=task_status,
+                        # The task's last save is when it became pending
+                        became_pending_at=updated_at if task_status == 'pending' else None,
+                        institution_id=institution_id,
+                    ))
+                elif current[1] != task_status:
+                    to_update.append(cls(
+                        id=current[0],
+                        user_id=user_id,
+                        status=task_status,
+                        became_pending_at=(current[2] or updated_at) if task_status == 'pending' else None,
+                    ))
+
+        stale = [key for key in existing if key not in wanted]
+        if stale:
+            cls.objects.filter(id__in=[existing[key][0] for key in stale]).delete()
+        if to_create:
+            cls.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_update:
+            cls.objects.bulk_update(to_update, ['status', 'became_pending_at'])
+
+        changed_users = [key[0] for key in stale]
+        changed_users += [entry.user_id for entry in to_create]
+        changed_users += [entry.user_id for entry in to_update]
+        invalidate_approval_dashboards(changed_users)
+
+    @classmethod
+    def sync_levels(cls, level_ids):
+        """Re-sync the open tasks of levels whose approvers changed."""
+        level_ids = set(level_ids)
+        if not level_ids:
+            return
+        task_ids = set(ApprovalTask.objects.filter(
+            level_id__in=level_ids, status__in=cls.OPEN_STATUSES, approval__status='ongoing'
+        ).values_list('id', flat=True))
+        task_ids.update(cls.objects.filter(
+            approval_task__level_id__in=level_ids
+        ).values_list('approval_task_id', flat=True))
+        cls.sync_tasks(task_ids)
+
 class BaseApprovableModel(SoftDeletableTimeStampedModel):
     STATUS_CHOICES = [
         ('under_creation', 'Under Creation'),
@@ -426,20 +779,22 @@ class BaseApprovableModel(SoftDeletableTimeStampedModel):
         raise ValidationError({"error": "Institution not found for this object"})
 
     def _trigger_approval(self, action_name: str):
-        action = Action.objects.get(name=action_name)
+        from audit.signals import log_bulk_create
+        from .routing import get_approval_route
+
         content_type = ContentType.objects.get_for_model(self.__class__)
         institution = self.get_institution()
 
         if not institution:
             raise ValidationError({"error": "No institution for this object"})
 
-        document = ApprovalDocument.objects.filter(
-            institution=institution,
-            content_type=content_type,
-            actions=action
-        ).first()
+        # Cached per institution, no query when nothing changed since the last lookup
+        action_id, route = get_approval_route(institution.id, content_type.id, action_name)
+        if action_id is None:
+            raise Action.DoesNotExist(f"Action matching name '{action_name}' does not exist.")
+        action = Action(id=action_id, name=action_name)
 
-        if not document:
+        if route is None:
             # Auto-complete the action
             if action_name in ['create', 'update']:
                 self.approval_status = 'active'
@@ -467,35 +822,37 @@ class BaseApprovableModel(SoftDeletableTimeStampedModel):
             self.save(update_fields=['is_active'])
             approval = Approval.objects.create(
                 status='ongoing',
-                document=document,
+                document_id=route["document_id"],
                 action=action,
                 content_type=content_type,
                 object_id=self.pk
             )
 
-            levels = document.levels.order_by('level')
-            for i, lvl in enumerate(levels):
-                task_status = 'pending' if i == 0 else 'not_started'
-                ApprovalTask.objects.create(
+            tasks = ApprovalTask.objects.bulk_create([
+                ApprovalTask(
                     approval=approval,
-                    level=lvl,
-                    status=task_status
+                    level_id=level_id,
+                    status='pending' if i == 0 else 'not_started'
                 )
-            # Notify first task
-            first_task = approval.tasks.filter(status='pending').first()
-            if first_task:
+                for i, (level_id, _level) in enumerate(route["levels"])
+            ])
+            # bulk_create sends no post_save, record the rows in the audit trail and inboxes
+            log_bulk_create(ApprovalTask, tasks)
+            ApprovalInboxEntry.sync_tasks(task.pk for task in tasks)
+
+            # Notify the approvers of the first level, its task is the pending one
+            if tasks:
+                first_level_id, first_level = route["levels"][0]
                 object_desc = str(self) if self else "an object"
-                message = f"A new approval task is pending for you: Approve {object_desc} at level {first_task.level.level}."
-                # Get model_name and object_id for the content object
-                model_name = content_type.model
-                object_id = str(self.pk)
-                for approver_user in first_task.level.get_approver_users():
-                    add_notification(
-                        user_id=approver_user.id,
-                        message=message,
-                        model_name=model_name,
-                        object_id=object_id
-                    )
+                message = f"A new approval task is pending for you: Approve {object_desc} at level {first_level}."
+                approver_ids = ApproverIndex.get_user_ids(first_level_id)
+                # One pipelined Redis call, once the approval is committed
+                transaction.on_commit(lambda: add_notifications(
+                    approver_ids,
+                    message=message,
+                    model_name=content_type.model,
+                    object_id=str(self.pk)
+                ))
 
     def confirm_create(self):
         if self.approval_status != 'under_creation':
@@ -0,0 +1,145 @@
+import logging
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Bumped on any Action change, routes are keyed by action name
+GLOBAL_VERSION_KEY = "approval_routing:version"
+
+# institution_id -> (version, routing table), validated against the cache version on every read
+_local_tables = {}
+_local_lock = threading.Lock()
+
+
+def _institution_version_key(institution_id) -> str:
+    return f"approval_routing:version:{institution_id}"
+
+
+def _table_key(institution_id, version) -> str:
+    return f"approval_routing:table:{institution_id}:{version}"
+
+
+def build_routing_table(institution_id) -> dict:
+    """
+    Read the approval configuration of an institution:
+    {"actions": {name: id}, "routes": {"<content_type_id>:<action name>":
+    {"document_id": id, "levels": [(level_id, level number), ...]}},
+    "duplicate_actions": [name, ...]}. Names shared by several actions are
+    left out of "actions" and listed in "duplicate_actions".
+    """
+    from .models import Action, ApprovalDocument, ApprovalDocumentLevel
+
+    routes = {}
+    links = ApprovalDocument.objects.filter(
+        institution_id=institution_id, actions__isnull=False
+    ).order_by("id").values_list("id", "content_type_id", "actions__name")
+    for document_id, content_type_id, action_name in links:
+        # Same pick as .first() on the unordered queryset: the oldest document wins
+        routes.setdefault(f"{content_type_id}:{action_name}", {"document_id": document_id, "levels": []})
+
+    document_levels = {}
+    document_ids = {route["document_id"] for route in routes.values()}
+    for document_id, level_id, level in ApprovalDocumentLevel.objects.filter(
+        approval_document_id__in=document_ids
+    ).order_by("level").values_list("approval_document_id", "id", "level"):
+        document_levels.setdefault(document_id, []).append((level_id, level))
+    for route in routes.values():
+        route["levels"] = document_levels.get(route["document_id"], [])
+
+    actions = {}
+    duplicate_actions = set()
+    for name, action_id in Action.objects.values_list("name", "id"):
+        if name in actions:
+            duplicate_actions.add(name)
+        actions[name] = action_id
+    for name in duplicate_actions:
+        del actions[name]
+    if duplicate_actions:
+        logger.error(f"Several approval actions share the name(s) {', '.join(sorted(duplicate_actions))}")
+
+    return {
+        "actions": actions,
+        "routes": routes,
+        "duplicate_actions": sorted(duplicate_actions),
+    }
+
+
+def _get_version(key) -> str:
+    version = cache.get(key)
+    if version is None:
+        # add() keeps a version set concurrently by another process
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_routing_table(institution_id) -> dict:
+    """
+    Routing table of an institution. Served from this process while the
+    versions in the shared cache are unchanged, then from the shared cache,
+    and only rebuilt from the database after an invalidation.
+    """
+    versions = cache.get_many([GLOBAL_VERSION_KEY, _institution_version_key(institution_id)])
+    global_version = versions.get(GLOBAL_VERSION_KEY) or _get_version(GLOBAL_VERSION_KEY)
+    institution_version = (
+        versions.get(_institution_version_key(institution_id))
+        or _get_version(_institution_version_key(institution_id))
+    )
+    version = f"{global_version}:{institution_version}"
+
+    local = _local_tables.get(institution_id)
+    if local is not None and local[0] == version:
+        return local[1]
+
+    table = cache.get(_table_key(institution_id, version))
+    if table is None:
+        table = build_routing_table(institution_id)
+        cache.set(_table_key(institution_id, version), table, settings.APPROVAL_ROUTING_CACHE_TIMEOUT)
+    with _local_lock:
+        _local_tables[institution_id] = (version, table)
+    return table
+
+
+def get_approval_route(institution_id, content_type_id, action_name):
+    """
+    (action_id, route) for an object of content_type_id going through
+    action_name, route being None when no approval document applies.
+    action_id is None for an unknown action. Raises
+    Action.MultipleObjectsReturned when several actions have that name.
+    """
+    from .models import Action
+
+    table = get_routing_table(institution_id)
+    if action_name in table.get("duplicate_actions", ()):
+        raise Action.MultipleObjectsReturned(f"Several actions are named '{action_name}'.")
+    return table["actions"].get(action_name), table["routes"].get(f"{content_type_id}:{action_name}")
+
+
+def _bump(key) -> None:
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def invalidate_institution_routing(institution_id) -> None:
+    """Drop the cached routing of an institution, now and again once the transaction commits."""
+    def invalidate():
+        _bump(_institution_version_key(institution_id))
+        with _local_lock:
+            _local_tables.pop(institution_id, None)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def invalidate_all_routing() -> None:
+    def invalidate():
+        _bump(GLOBAL_VERSION_KEY)
+        with _local_lock:
+            _local_tables.clear()
+
+    invalidate()
+    transaction.on_commit(invalidate)
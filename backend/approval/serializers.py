@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Q
 from approval.models import (
     Action, ApproverGroup, ApprovalDocument, ApprovalDocumentLevel,
     Approval, ApprovalTask, ApproverGroupUser, ApproverGroupRole,
@@ -186,6 +188,11 @@ class ApprovalDocumentSerializer(serializers.ModelSerializer):
         model = ApprovalDocument
         fields = ['id', 'institution', 'institution_name', 'public_uuid', 'description', 'content_type', 'content_type_name', 'actions', 'levels']
 
+    def create(self, validated_data):
+        # Actions are added after the insert, a duplicate action set must roll the document back
+        with transaction.atomic():
+            return super().create(validated_data)
+
     def get_content_type_name(self, obj):
         model_class = obj.content_type.model_class()
         if not model_class:
@@ -216,6 +223,15 @@ class ApprovalTaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['approved_by', 'updated_at']
 
+class ApprovalTaskBulkActionSerializer(serializers.Serializer):
+    task_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
+    action = serializers.ChoiceField(choices=list(ApprovalTask.BULK_ACTIONS))
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_task_ids(self, value):
+        # Keep the caller's order, drop repeats
+        return list(dict.fromkeys(value))
+
 class ApprovalSerializer(serializers.ModelSerializer):
     tasks = ApprovalTaskSerializer(many=True, read_only=True)
     document = ApprovalDocumentSerializer(read_only=True)
@@ -225,16 +241,91 @@ class ApprovalSerializer(serializers.ModelSerializer):
         model = Approval
         fields = ['id', 'public_id', 'status', 'document', 'action', 'content_type', 'object_id', 'tasks']
 
+def load_approvals(objs, summary=False):
+    """
+    Attach the approvals of every object in objs in one pass: a single
+    approval query across all content types, its tasks and levels prefetched
+    alongside. With summary=True only the count and the latest approval's
+    status are loaded, as a values() query with no nested rows.
+    """
+    by_content_type = {}
+    for obj in objs:
+        if obj.pk is None:
+            continue
+        content_type = ContentType.objects.get_for_model(obj.__class__)
+        by_content_type.setdefault(content_type.id, {})[obj.pk] = obj
+    if not by_content_type:
+        return
+
+    lookup = Q()
+    for content_type_id, objects in by_content_type.items():
+        lookup |= Q(content_type_id=content_type_id, object_id__in=list(objects))
+
+    loaded = {}
+    if summary:
+        approvals = Approval.objects.filter(lookup).order_by('id').values(
+            'id', 'public_id', 'status', 'content_type_id', 'object_id', 'action__name'
+        )
+        for approval in approvals:
+            key = (approval['content_type_id'], approval['object_id'])
+            entry = loaded.setdefault(key, {'count': 0, 'latest': None})
+            entry['count'] += 1
+            entry['latest'] = {
+                'id': approval['id'],
+                'public_id': approval['public_id'],
+                'status': approval['status'],
+                'action': approval['action__name'],
+            }
+    else:
+        approvals = Approval.objects.filter(lookup).select_related(
+            'document__institution', 'document__content_type', 'action', 'content_type'
+        ).prefetch_related('tasks__level', 'tasks__approved_by', 'document__levels', 'document__actions')
+        for approval in approvals:
+            loaded.setdefault((approval.content_type_id, approval.object_id), []).append(approval)
+
+    empty = {'count': 0, 'latest': None} if summary else []
+    for content_type_id, objects in by_content_type.items():
+        for pk, obj in objects.items():
+            obj._approvals_cache = (summary, loaded.get((content_type_id, pk), empty))
+
+
+class ApprovableListSerializer(serializers.ListSerializer):
+    """Loads the approvals of the whole list before its items are serialized."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if 'approvals' in self.child.fields:
+            load_approvals(items, summary=self.child.approvals_summary_requested())
+        return super().to_representation(items)
+
+
 class BaseApprovableSerializer(serializers.ModelSerializer):
+    """
+    Pass ?approvals=summary to get {"count", "latest"} per object instead of
+    the full nested approval tree.
+    """
     approvals = serializers.SerializerMethodField()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Subclasses declare their own Meta, give each the batching list serializer
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = ApprovableListSerializer
+
+    def approvals_summary_requested(self):
+        request = self.context.get('request')
+        return request is not None and request.query_params.get('approvals') == 'summary'
+
     def get_approvals(self, obj):
-        content_type = ContentType.objects.get_for_model(obj.__class__)
-        approvals = Approval.objects.filter(
-            content_type=content_type,
-            object_id=obj.pk
-        ).select_related('document', 'action', 'content_type').prefetch_related('tasks__level', 'document__levels')
-        return ApprovalSerializer(approvals, many=True).data
+        summary = self.approvals_summary_requested()
+        cached = getattr(obj, '_approvals_cache', None)
+        if cached is None or cached[0] != summary:
+            load_approvals([obj], summary=summary)
+            cached = obj._approvals_cache
+        if summary:
+            return cached[1]
+        return ApprovalSerializer(cached[1], many=True).data
 
     class Meta:
         abstract = True
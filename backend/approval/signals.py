@@ -0,0 +1,187 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from users.models import UserRole
+from .models import (
+    invalidate_approval_dashboards, Action, Approval, ApprovalInboxEntry, ApprovalTask, ApproverIndex, ApproverGroup, ApproverGroupUser, ApproverGroupRole, ApprovalDocument,
+    ApprovalDocumentLevel, ApprovalDocumentLevelApprovers, ApprovalDocumentLevelOverriders,
+)
+from .routing import invalidate_all_routing, invalidate_institution_routing
+
+_PENDING_LEVELS_ATTR = "_approver_index_levels"
+_PENDING_DOCUMENTS_ATTR = "_actions_hash_documents"
+
+
+def get_levels_for_groups(group_ids) -> set:
+    """Levels where any of the groups approves or overrides."""
+    group_ids = list(group_ids)
+    if not group_ids:
+        return set()
+    levels = set(ApprovalDocumentLevelApprovers.objects.filter(
+        approver_group_id__in=group_ids
+    ).values_list('approval_document_level_id', flat=True))
+    levels.update(ApprovalDocumentLevelOverriders.objects.filter(
+        approver_group_id__in=group_ids
+    ).values_list('approval_document_level_id', flat=True))
+    return levels
+
+
+def get_levels_for_roles(role_ids) -> set:
+    group_ids = ApproverGroupRole.objects.filter(role_id__in=list(role_ids)).values_list('approver_group_id', flat=True)
+    return get_levels_for_groups(group_ids)
+
+
+@receiver(post_save, sender=ApproverGroupUser)
+@receiver(post_delete, sender=ApproverGroupUser)
+@receiver(post_save, sender=ApproverGroupRole)
+@receiver(post_delete, sender=ApproverGroupRole)
+def refresh_index_for_group_member(sender, instance, **kwargs):
+    ApproverIndex.rebuild(get_levels_for_groups([instance.approver_group_id]))
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def refresh_index_for_user_role(sender, instance, **kwargs):
+    ApproverIndex.rebuild(get_levels_for_roles([instance.role_id]))
+
+
+@receiver(post_save, sender=ApprovalDocumentLevelApprovers)
+@receiver(post_delete, sender=ApprovalDocumentLevelApprovers)
+@receiver(post_save, sender=ApprovalDocumentLevelOverriders)
+@receiver(post_delete, sender=ApprovalDocumentLevelOverriders)
+def refresh_index_for_level_group(sender, instance, **kwargs):
+    ApproverIndex.rebuild([instance.approval_document_level_id])
+
+
+def _get_affected_levels(sender, instance, reverse, pk_set) -> set:
+    """Levels touched by an m2m change on one of the approval through tables."""
+    if sender in (ApprovalDocumentLevelApprovers, ApprovalDocumentLevelOverriders):
+        if isinstance(instance, ApprovalDocumentLevel):
+            return {instance.pk}
+        # Reverse side: instance is the group, pk_set the levels
+        return set(pk_set) if pk_set is not None else get_levels_for_groups([instance.pk])
+
+    # Group members or roles: from the group side pk_set holds profiles/roles
+    if isinstance(instance, ApproverGroup):
+        return get_levels_for_groups([instance.pk])
+    if pk_set is not None:
+        return get_levels_for_groups(pk_set)
+    through_field = 'user' if sender is ApproverGroupUser else 'role'
+    group_ids = sender.objects.filter(**{through_field: instance}).values_list('approver_group_id', flat=True)
+    return get_levels_for_groups(group_ids)
+
+
+@receiver(m2m_changed, sender=ApprovalDocumentLevelApprovers)
+@receiver(m2m_changed, sender=ApprovalDocumentLevelOverriders)
+@receiver(m2m_changed, sender=ApproverGroupUser)
+@receiver(m2m_changed, sender=ApproverGroupRole)
+def refresh_index_for_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    .add()/.remove()/.set()/.clear() bypass the save/delete signals of the
+    through models. A clear has no pk_set, so the affected levels are
+    collected before the rows disappear.
+    """
+    if action == 'pre_clear':
+        setattr(instance, _PENDING_LEVELS_ATTR, _get_affected_levels(sender, instance, reverse, None))
+    elif action == 'post_clear':
+        ApproverIndex.rebuild(instance.__dict__.pop(_PENDING_LEVELS_ATTR, set()))
+    elif action in ('post_add', 'post_remove'):
+        ApproverIndex.rebuild(_get_affected_levels(sender, instance, reverse, pk_set))
+
+
+@receiver(post_save, sender=ApprovalDocument)
+@receiver(post_delete, sender=ApprovalDocument)
+def invalidate_routing_for_document(sender, instance, **kwargs):
+    invalidate_institution_routing(instance.institution_id)
+
+
+def refresh_actions_hash(documents, reject_duplicates=False) -> None:
+    """Recompute actions_hash of the documents, a duplicate action set clears it or is rejected."""
+    for document in documents:
+        actions_hash = ApprovalDocument.compute_actions_hash(document.actions.values_list('id', flat=True))
+        if document.has_duplicate_actions(actions_hash):
+            if reject_duplicates:
+                raise ValidationError(
+                    {"error": "An approval document with the same content type and actions already exists."}
+                )
+            actions_hash = None
+        document.actions_hash = actions_hash
+        ApprovalDocument.objects.filter(pk=document.pk).update(actions_hash=actions_hash)
+
+
+@receiver(m2m_changed, sender=ApprovalDocument.actions.through)
+def refresh_document_actions_hash(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep ApprovalDocument.actions_hash in step with the actions. .set()
+    removes before it adds, so a removal that lands on another document's
+    action set only clears the hash; the save that follows settles it.
+    A reverse clear has no pk_set, so its documents are collected before
+    the rows disappear.
+    """
+    if action == 'pre_clear':
+        if not isinstance(instance, ApprovalDocument):
+            setattr(instance, _PENDING_DOCUMENTS_ATTR, list(instance.approval_documents.values_list('pk', flat=True)))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, ApprovalDocument):
+        documents = [instance]
+    elif action == 'post_clear':
+        documents = ApprovalDocument.objects.filter(pk__in=instance.__dict__.pop(_PENDING_DOCUMENTS_ATTR, []))
+    else:
+        documents = ApprovalDocument.objects.filter(pk__in=pk_set or [])
+    refresh_actions_hash(documents, reject_duplicates=action == 'post_add')
+
+
+@receiver(pre_delete, sender=Action)
+def collect_documents_for_action(sender, instance, **kwargs):
+    # Deleting an action drops its through rows without m2m_changed
+    setattr(instance, _PENDING_DOCUMENTS_ATTR, list(instance.approval_documents.values_list('pk', flat=True)))
+
+
+@receiver(post_delete, sender=Action)
+def refresh_actions_hash_for_action(sender, instance, **kwargs):
+    refresh_actions_hash(ApprovalDocument.objects.filter(pk__in=instance.__dict__.pop(_PENDING_DOCUMENTS_ATTR, [])))
+
+
+@receiver(m2m_changed, sender=ApprovalDocument.actions.through)
+def invalidate_routing_for_document_actions(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, ApprovalDocument):
+        invalidate_institution_routing(instance.institution_id)
+    else:
+        # Reverse side: action.approval_documents.add(...)
+        invalidate_all_routing()
+
+
+@receiver(post_save, sender=ApprovalDocumentLevel)
+@receiver(post_delete, sender=ApprovalDocumentLevel)
+def invalidate_routing_for_level(sender, instance, **kwargs):
+    institution_id = ApprovalDocument.objects.filter(
+        id=instance.approval_document_id
+    ).values_list('institution_id', flat=True).first()
+    if institution_id is not None:
+        invalidate_institution_routing(institution_id)
+
+
+@receiver(post_save, sender=Action)
+@receiver(post_delete, sender=Action)
+def invalidate_routing_for_action(sender, instance, **kwargs):
+    invalidate_all_routing()
+
+
+@receiver(post_save, sender=ApprovalTask)
+def sync_inbox_for_task(sender, instance, **kwargs):
+    ApprovalInboxEntry.sync_tasks([instance.pk])
+    # Outgoing counts of the user who acted on the task
+    invalidate_approval_dashboards([instance.approved_by_id])
+
+
+@receiver(post_save, sender=Approval)
+def sync_inbox_for_approval(sender, instance, created, **kwargs):
+    # A finished approval takes all of its tasks out of the inboxes,
+    # including the ones terminated later with a queryset update.
+    if not created:
+        ApprovalInboxEntry.sync_tasks(instance.tasks.values_list('id', flat=True))
@@ -1,33 +1,85 @@
 from datetime import timedelta
+from itertools import islice
+from django.conf import settings
 from django.utils import timezone
 from celery import shared_task
-from approval.models import ApprovalTask
-from communication.views import add_notification  
+from approval.models import ApprovalTask, ApproverIndex
+from communication.views import push_notifications, redis_client
+from utilities.generic_relations import bulk_resolve_generic_objects
+
+
+def get_reminder_key(task_id, user_id) -> str:
+    return f"approval_reminder:{task_id}:{user_id}"
 
 
 @shared_task
-def send_overdue_approval_reminders():
+def send_overdue_approval_reminders(chunk_size=500):
     """
     Celery task to send reminders for approval tasks
     that are pending and overdue (> 3 days).
+
+    Tasks are read in chunks. Each approver is reminded at most once per
+    task every APPROVAL_REMINDER_INTERVAL_HOURS: the reminder is claimed
+    with a Redis key that expires after the interval, so overlapping or
+    repeated runs do not send it twice. Returns the number of reminders sent.
     """
     current_time = timezone.now()
     reminder_threshold = timedelta(days=3)
 
     pending_tasks = ApprovalTask.objects.filter(
         status='pending',
+        approval__status='ongoing',
         updated_at__lt=current_time - reminder_threshold
-    )
+    ).order_by('id').values_list(
+        'id', 'level_id', 'level__level', 'approval__content_type_id', 'approval__object_id'
+    ).iterator(chunk_size=chunk_size)
+
+    sent = 0
+    while True:
+        chunk = list(islice(pending_tasks, chunk_size))
+        if not chunk:
+            return sent
+        sent += send_reminder_chunk(chunk)
+
 
-    for task in pending_tasks:
-        object_desc = str(task.approval.content_object) if task.approval.content_object else "an object"
+def send_reminder_chunk(tasks) -> int:
+    """Remind the approvers of a chunk of (id, level_id, level, content_type_id, object_id) rows."""
+    interval = int(timedelta(hours=settings.APPROVAL_REMINDER_INTERVAL_HOURS).total_seconds())
+
+    approvers = {}
+    for level_id, user_id in ApproverIndex.objects.filter(
+        level_id__in={task[1] for task in tasks},
+        kind=ApproverIndex.KIND_APPROVER,
+        user__is_active=True
+    ).values_list('level_id', 'user_id'):
+        approvers.setdefault(level_id, []).append(user_id)
+
+    # Content objects, one query per content type
+    content_objects = bulk_resolve_generic_objects((task[3], task[4]) for task in tasks)
+
+    reminders = []
+    for task_id, level_id, level, content_type_id, object_id in tasks:
+        content_object = content_objects.get((content_type_id, object_id))
+        object_desc = str(content_object) if content_object else "an object"
         message = (
             f"Reminder: You have a pending approval task for "
-            f"{object_desc} at level {task.level.level} that needs attention."
+            f"{object_desc} at level {level} that needs attention."
         )
+        for user_id in approvers.get(level_id, ()):
+            reminders.append((task_id, user_id, message))
+    if not reminders:
+        return 0
+
+    # Claim every (task, approver) pair; a pair already reminded this interval is skipped
+    pipe = redis_client.pipeline(transaction=False)
+    for task_id, user_id, _message in reminders:
+        pipe.set(get_reminder_key(task_id, user_id), 1, nx=True, ex=interval)
+    claimed = pipe.execute()
 
-        for approver_user in task.level.get_approver_users():
-            add_notification(
-                user_id=approver_user.id,
-                message=message,
-            )
+    notifications = [
+        (user_id, message, None, None)
+        for (task_id, user_id, message), is_new in zip(reminders, claimed) if is_new
+    ]
+    if notifications:
+        push_notifications(notifications)
+    return len(notifications)
@@ -6,7 +6,7 @@ from .views import (
     ApprovalDocumentLevelListAPIView, ApprovalDocumentLevelDetailAPIView,
     ApprovalListAPIView, ApprovalDetailAPIView,
     ApprovalTaskListAPIView, ApprovalTaskDetailAPIView,
-    ApprovalTaskApproveAPIView, ApprovalTaskRejectAPIView,
+    ApprovalTaskApproveAPIView, ApprovalTaskRejectAPIView, ApprovalTaskBulkActionAPIView,
     ApprovalTasksDashboardAPIView, ApprovableContentTypesListAPIView
 )
 
@@ -35,6 +35,7 @@ urlpatterns = [
     
     # Approval Tasks URLs
     path('approval-tasks/', ApprovalTaskListAPIView.as_view(), name='approval-task-list'),
+    path('approval-tasks/bulk-action/', ApprovalTaskBulkActionAPIView.as_view(), name='approval-task-bulk-action'),
     path('approval-tasks/<int:pk>/', ApprovalTaskDetailAPIView.as_view(), name='approval-task-detail'),
     path('approval-tasks/<int:pk>/approve/', ApprovalTaskApproveAPIView.as_view(), name='approval-task-approve'),
     path('approval-tasks/<int:pk>/reject/', ApprovalTaskRejectAPIView.as_view(), name='approval-task-reject'),
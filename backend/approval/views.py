@@ -8,23 +8,26 @@ from utilities.sortable_api import SortableAPIMixin
 from institution.models import Institution
 from .models import (
     Action, ApproverGroup, ApprovalDocument, ApprovalDocumentLevel,
-    Approval, ApprovalTask, BaseApprovableModel
+    Approval, ApprovalInboxEntry, ApprovalTask, BaseApprovableModel, get_dashboard_cache_key
 )
 from .serializers import (
     ActionSerializer, ApproverGroupSerializer, ApprovalDocumentSerializer,
-    ApprovalDocumentLevelSerializer, ApprovalSerializer, ApprovalTaskSerializer
+    ApprovalDocumentLevelSerializer, ApprovalSerializer, ApprovalTaskSerializer, ApprovalTaskBulkActionSerializer
 )
-from django.urls import reverse, NoReverseMatch
+from utilities.generic_relations import get_content_object_info
 from utilities.pagination import CustomPageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiResponse,OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_view
-from users.models import Role
+from users.models import CustomUser
 from rest_framework import serializers
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Q
+from django.db.models import Count, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from django.conf import settings
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
@@ -570,20 +573,6 @@ class ApprovalTaskListAPIView(APIView, SortableAPIMixin):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get user's roles
-        user_roles = Role.objects.filter(user_roles__user=user)
-
-        # Get groups the user belongs to, filtered by institution
-        user_groups = ApproverGroup.objects.filter(
-            Q(users=profile) | Q(roles__in=user_roles),
-            institution=institution
-        ).distinct()
-
-        # Get levels where user's groups are approvers
-        levels = ApprovalDocumentLevel.objects.filter(
-            approvers__in=user_groups
-        ).distinct()
-
         # Base tasks query
         tasks = ApprovalTask.objects.filter(
             approval__document__institution=institution,
@@ -596,31 +585,29 @@ class ApprovalTaskListAPIView(APIView, SortableAPIMixin):
             critical_threshold = timedelta(days=5)
             expired_threshold = timedelta(days=7)
 
+            # Open tasks come from the user's approval inbox, which only holds
+            # tasks of ongoing approvals at levels the user approves
             if type_filter == 'incoming':
                 tasks = tasks.filter(
-                    level__in=levels,
-                    approval__status='ongoing',
-                    status='not_started'
+                    inbox_entries__user=user,
+                    inbox_entries__status='not_started'
                 )
             elif type_filter == 'open':
                 tasks = tasks.filter(
-                    level__in=levels,
-                    approval__status='ongoing',
-                    status='pending'
+                    inbox_entries__user=user,
+                    inbox_entries__status='pending'
                 )
             elif type_filter == 'critical':
                 tasks = tasks.filter(
-                    level__in=levels,
-                    approval__status='ongoing',
-                    status='pending',
-                    updated_at__lt=current_time - critical_threshold
+                    inbox_entries__user=user,
+                    inbox_entries__status='pending',
+                    inbox_entries__became_pending_at__lt=current_time - critical_threshold
                 )
             elif type_filter == 'expired':
                 tasks = tasks.filter(
-                    level__in=levels,
-                    approval__status='ongoing',
-                    status='pending',
-                    updated_at__lt=current_time - expired_threshold
+                    inbox_entries__user=user,
+                    inbox_entries__status='pending',
+                    inbox_entries__became_pending_at__lt=current_time - expired_threshold
                 )
             elif type_filter == 'outgoing':
                 tasks = tasks.filter(
@@ -646,18 +633,16 @@ class ApprovalTaskListAPIView(APIView, SortableAPIMixin):
             tasks = tasks.filter(status=status_filter)
 
         if assigned_to:
-            tasks = tasks.filter(
-                Q(level__approvers__users__user__id=assigned_to) |
-                Q(level__overriders__users__user__id=assigned_to) |
-                Q(level__approvers__roles__user_roles__user__id=assigned_to) |
-                Q(level__overriders__roles__user_roles__user__id=assigned_to)
-            ).distinct()
+            # Approvers and overriders of the task's level
+            tasks = tasks.filter(level__approver_index__user_id=assigned_to).distinct()
 
         try:
             tasks = self.apply_sorting(tasks, request)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        tasks = tasks.select_related('approval__document', 'level', 'approved_by')
+
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(tasks, request)
         serializer = ApprovalTaskSerializer(paginated_qs, many=True)
@@ -665,26 +650,9 @@ class ApprovalTaskListAPIView(APIView, SortableAPIMixin):
         # Enhance serialized data with content object information
         data = serializer.data
         for task_data, task in zip(data, paginated_qs):
-            approval = task.approval
-            content_type = approval.content_type
-            object_id = approval.object_id
-
-            content_info = {
-                'content_type': {
-                    'app_label': content_type.app_label,
-                    'model': content_type.model,
-                },
-                'object_id': object_id,
-            }
-
-            # Attempt to generate a URL for the content object
-            try:
-                view_name = f"{content_type.app_label}-{content_type.model}-detail"
-                content_info['url'] = reverse(view_name, kwargs={'pk': object_id})
-            except NoReverseMatch:
-                content_info['url'] = None
-
-            task_data['content_object'] = content_info
+            task_data['content_object'] = get_content_object_info(
+                task.approval.content_type_id, task.approval.object_id
+            )
 
         return paginator.get_paginated_response(data)
 
@@ -710,32 +678,8 @@ class ApprovalTaskDetailAPIView(APIView):
         serializer = ApprovalTaskSerializer(task)
         data = serializer.data
 
-        # Get the related content object details
-        approval = task.approval
-        content_type = approval.content_type
-        object_id = approval.object_id
-        content_object = approval.content_object
-
-        # Prepare content object information
-        content_info = {
-            'content_type': {
-                'app_label': content_type.app_label,
-                'model': content_type.model,
-            },
-            'object_id': object_id,
-        }
-
-        # Attempt to generate a URL for the content object
-        try:
-            # Assume the detail view follows Django's default naming convention: <app_label>-<model_name>-detail
-            view_name = f"{content_type.app_label}-{content_type.model}-detail"
-            content_info['url'] = reverse(view_name, kwargs={'pk': object_id})
-        except NoReverseMatch:
-            # If no detail view exists, URL will not be included
-            content_info['url'] = None
-
         # Add content object details to the response
-        data['content_object'] = content_info
+        data['content_object'] = get_content_object_info(task.approval.content_type_id, task.approval.object_id)
 
         return Response(data)
 
@@ -800,6 +744,35 @@ class ApprovalTaskRejectAPIView(APIView):
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+class ApprovalTaskBulkActionAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=['Approval Tasks'],
+        request=ApprovalTaskBulkActionSerializer,
+        responses={200: OpenApiTypes.OBJECT},
+        description='Approve, reject or override several approval tasks at once. Tasks that cannot be processed are reported in the per-item results, the others are applied in a single transaction.'
+    )
+    def post(self, request):
+        serializer = ApprovalTaskBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task_ids = serializer.validated_data['task_ids']
+
+        results = ApprovalTask.bulk_transition(
+            request.user,
+            task_ids,
+            serializer.validated_data['action'],
+            serializer.validated_data.get('comment'),
+        )
+        items = [{'task_id': task_id, **results[task_id]} for task_id in task_ids]
+        succeeded = sum(1 for item in items if 'status' in item)
+        return Response({
+            'succeeded': succeeded,
+            'failed': len(items) - succeeded,
+            'results': items,
+        }, status=status.HTTP_200_OK)
+
+
 class PendingApprovalTasksListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -814,27 +787,13 @@ class PendingApprovalTasksListView(APIView):
     )
     def get(self, request):
         user = request.user
-        profile = user.profile
-
-        # Get roles of the user
-        user_roles = Role.objects.filter(user_roles__user=user)
 
-        # Get groups the user belongs to directly or via roles
-        user_groups = ApproverGroup.objects.filter(
-            Q(users=profile) | Q(roles__in=user_roles)
-        ).distinct()
-
-        # Find levels where these groups are approvers
-        levels = ApprovalDocumentLevel.objects.filter(
-            approvers__in=user_groups
-        ).distinct()
-
-        # Find pending tasks in those levels
-        tasks = ApprovalTask.objects.filter(
-            level__in=levels,
-            status='pending',
-            approval__status='ongoing'
-        ).order_by('updated_at')
+        # Pending tasks waiting on the user, oldest first
+        entries = ApprovalInboxEntry.objects.filter(
+            user=user,
+            status='pending'
+        ).select_related('approval_task').order_by('became_pending_at')
+        tasks = [entry.approval_task for entry in entries]
 
         serializer = ApprovalTaskSerializer(tasks, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -852,68 +811,53 @@ class ApprovalTasksDashboardAPIView(APIView):
         user = request.user
         profile = user.profile
 
-        # Get user's roles
-        user_roles = Role.objects.filter(user_roles__user=user)
-
         # Get user's institution
         try:
-            institution = profile.institution
+            institution_id = profile.institution_id
         except AttributeError:
             return Response({"error": "User profile does not have an associated institution."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get groups the user belongs to, filtered by institution
-        user_groups = ApproverGroup.objects.filter(
-            Q(users=profile) | Q(roles__in=user_roles),
-            institution=institution
-        ).distinct()
+        # Polled by every approver's browser, cached until one of the user's tasks changes
+        cache_key = get_dashboard_cache_key(user.id)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_counts(user, institution_id)
+            cache.set(cache_key, data, settings.APPROVAL_DASHBOARD_CACHE_TIMEOUT)
 
-        # Get levels where user's groups are approvers
-        levels = ApprovalDocumentLevel.objects.filter(
-            approvers__in=user_groups
-        ).distinct()
-
-        # Base tasks for ongoing approvals in these levels
-        base_tasks = ApprovalTask.objects.filter(
-            level__in=levels,
-            approval__status='ongoing',
-            approval__document__institution=institution
-        )
-
-        # Incoming tasks: not started
-        incoming_tasks_qs = base_tasks.filter(status='not_started')
-
-        # Open tasks: pending for the user
-        open_tasks_qs = base_tasks.filter(status='pending')
+        return Response(data, status=status.HTTP_200_OK)
 
+    def get_counts(self, user, institution_id):
+        """Every bucket in one query: conditional counts over the user's inbox plus an outgoing subquery."""
         # Define thresholds
         current_time = timezone.now()
         critical_threshold = timedelta(days=5)
         expired_threshold = timedelta(days=7)
 
-        # Critical tasks: pending > 5 days
-        critical_tasks_qs = open_tasks_qs.filter(updated_at__lt=current_time - critical_threshold)
-
-        # Expired tasks: pending > 7 days
-        expired_tasks_qs = open_tasks_qs.filter(updated_at__lt=current_time - expired_threshold)
-
         # Outgoing tasks: recently approved or rejected by this user
         outgoing_tasks_qs = ApprovalTask.objects.filter(
             approved_by=user,
             status__in=('approved', 'rejected'),
             updated_at__gte=current_time - timedelta(days=7),
-            approval__document__institution=institution
-        )
+            approval__document__institution=institution_id
+        ).order_by().values('approved_by').annotate(count=Count('id')).values('count')
+
+        # Open tasks of ongoing approvals waiting on the user
+        inbox = Q(approval_inbox__institution=institution_id)
+        pending = inbox & Q(approval_inbox__status='pending')
+        counts = CustomUser.objects.filter(pk=user.pk).annotate(
+            incoming=Count('approval_inbox', filter=inbox & Q(approval_inbox__status='not_started')),
+            open=Count('approval_inbox', filter=pending),
+            critical=Count('approval_inbox', filter=pending & Q(
+                approval_inbox__became_pending_at__lt=current_time - critical_threshold
+            )),
+            expired=Count('approval_inbox', filter=pending & Q(
+                approval_inbox__became_pending_at__lt=current_time - expired_threshold
+            )),
+            outgoing=Coalesce(Subquery(outgoing_tasks_qs), 0),
+        ).values('incoming', 'open', 'critical', 'expired', 'outgoing').get()
 
         # Prepare response data with counts only
-        data = {
-            'incoming': {'count': incoming_tasks_qs.count()},
-            'open': {'count': open_tasks_qs.count()},
-            'critical': {'count': critical_tasks_qs.count()},
-            'expired': {'count': expired_tasks_qs.count()},
-            'outgoing': {'count': outgoing_tasks_qs.count()},
-        }
-
-        return Response(data, status=status.HTTP_200_OK)
+        return {bucket: {'count': count} for bucket, count in counts.items()}
     
 
 class ApprovableContentTypesListAPIView(APIView):
@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import AuditLog
+from .models import AuditLog, AuditLogArchive
 
 admin.site.register(AuditLog)
+admin.site.register(AuditLogArchive)
@@ -5,4 +5,12 @@ class AuditConfig(AppConfig):
     name = 'audit'
 
     def ready(self):
-        import audit.signals
\ No newline at end of file
+        import audit.signals
+        audit.signals.install_refresh_snapshot()
+        from django.db.models.signals import post_migrate
+        from django.utils.module_loading import autodiscover_modules
+        from audit.search import ensure_search_index
+
+        post_migrate.connect(ensure_search_index, sender=self)
+        # Every app declares what it audits in an audit_policies module
+        autodiscover_modules("audit_policies")
\ No newline at end of file
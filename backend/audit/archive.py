@@ -0,0 +1,324 @@
+import gzip
+import hashlib
+import heapq
+import json
+import os
+from collections import deque
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog, AuditLogArchive
+
+ARCHIVE_FIELDS = [
+    "id", "content_type_id", "object_id", "action", "user_id",
+    "institution_id", "timestamp", "changes", "description",
+]
+EXPORT_CHUNK_SIZE = 2000
+DELETE_CHUNK_SIZE = 5000
+# Rank of archived rows in search results, they are not in the full-text index
+ARCHIVED_RANK = 0
+
+
+def month_start(value):
+    """First instant of the month containing value, in the current timezone."""
+    value = timezone.localtime(value)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_archive_cutoff(months: int):
+    """Rows older than this instant belong to the cold (archived) storage."""
+    return month_start(timezone.now()) - relativedelta(months=months)
+
+
+def get_hot_boundary():
+    """
+    Oldest instant the hot AuditLog table is guaranteed to be complete for,
+    or None when nothing has been archived yet.
+    """
+    return AuditLogArchive.objects.aggregate(boundary=Max("period_end"))["boundary"]
+
+
+def range_reaches_archive(start_date) -> bool:
+    """
+    True when a date range starting at start_date needs archived months.
+    Without start_date the range is unbounded and reaches every archive.
+    """
+    boundary = get_hot_boundary()
+    if boundary is None:
+        return False
+    if not start_date:
+        return True
+    start = timezone.make_aware(datetime.combine(start_date, time.min))
+    return start < boundary
+
+
+def write_manifest() -> None:
+    """Rewrite manifest.json describing every archive file."""
+    root = settings.AUDIT_ARCHIVE_ROOT
+    os.makedirs(root, exist_ok=True)
+    manifest = [
+        {
+            "file": archive.file_name,
+            "institution_id": archive.institution_id,
+            "all_institutions": archive.all_institutions,
+            "period_start": archive.period_start,
+            "period_end": archive.period_end,
+            "row_count": archive.row_count,
+            "sha256": archive.checksum,
+            "archived_at": archive.archived_at,
+        }
+        for archive in AuditLogArchive.objects.order_by("period_start", "id")
+    ]
+    tmp_path = os.path.join(root, "manifest.json.tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump({"archives": manifest}, fh, cls=DjangoJSONEncoder, indent=2)
+    os.replace(tmp_path, os.path.join(root, "manifest.json"))
+
+
+def _write_archive_file(period_start, period_end, institution_id, rows):
+    """Export one institution's rows of a month to a gzip NDJSON file, then delete them."""
+    root = settings.AUDIT_ARCHIVE_ROOT
+    os.makedirs(root, exist_ok=True)
+    part = AuditLogArchive.objects.filter(
+        period_start=period_start, institution_id=institution_id, all_institutions=False
+    ).count() + 1
+    scope = institution_id if institution_id is not None else "none"
+    file_name = f"auditlog-{period_start:%Y-%m}-inst{scope}-part{part}.ndjson.gz"
+    path = os.path.join(root, file_name)
+
+    digest = hashlib.sha256()
+    exported_ids = []
+    with open(path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows.values(*ARCHIVE_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                line = (json.dumps(row, cls=DjangoJSONEncoder) + "\n").encode("utf-8")
+                gz.write(line)
+                digest.update(line)
+                exported_ids.append(row["id"])
+        raw.flush()
+        os.fsync(raw.fileno())
+    if not exported_ids:
+        os.remove(path)
+        return None
+
+    with transaction.atomic():
+        archive = AuditLogArchive.objects.create(
+            institution_id=institution_id,
+            period_start=period_start,
+            period_end=period_end,
+            file_name=file_name,
+            row_count=len(exported_ids),
+            checksum=digest.hexdigest(),
+        )
+
+        # Only delete the rows written to the file. Rows committed during the
+        # export stay hot, even those with a lower id or an older timestamp.
+        for offset in range(0, len(exported_ids), DELETE_CHUNK_SIZE):
+            ids = exported_ids[offset:offset + DELETE_CHUNK_SIZE]
+            # Archived rows need no per-row delete signals, skip the collector
+            AuditLog.objects.filter(id__in=ids)._raw_delete(AuditLog.objects.db)
+
+    return archive
+
+
+def _archive_period(period_start, period_end) -> list:
+    """
+    Export one month of audit rows to one file per institution, so reads
+    only open the files of the institution they are for.
+    """
+    rows = AuditLog.objects.filter(timestamp__gte=period_start, timestamp__lt=period_end)
+    institution_ids = list(rows.order_by().values_list("institution_id", flat=True).distinct())
+    archives = []
+    for institution_id in institution_ids:
+        # Files are written in (timestamp, id) order so readers can merge them without sorting
+        institution_rows = rows.filter(institution_id=institution_id).order_by("timestamp", "id")
+        archive = _write_archive_file(period_start, period_end, institution_id, institution_rows)
+        if archive:
+            archives.append(archive)
+    return archives
+
+
+def archive_audit_logs(months: int = None) -> list:
+    """
+    Move every month older than `months` out of the hot table into
+    compressed archive files. Returns the created AuditLogArchive rows.
+    """
+    if months is None:
+        months = settings.AUDIT_HOT_MONTHS
+    cutoff = get_archive_cutoff(months)
+    oldest = AuditLog.objects.filter(timestamp__lt=cutoff).aggregate(oldest=Min("timestamp"))["oldest"]
+    if oldest is None:
+        return []
+
+    archives = []
+    period_start = month_start(oldest)
+    while period_start < cutoff:
+        period_end = period_start + relativedelta(months=1)
+        archives.extend(_archive_period(period_start, period_end))
+        period_start = period_end
+
+    write_manifest()
+    return archives
+
+
+def _iter_archive_file(archive, institution_id, start=None, end=None):
+    """Rows of one archive file belonging to an institution within [start, end), in file order."""
+    path = os.path.join(settings.AUDIT_ARCHIVE_ROOT, archive.file_name)
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            row = json.loads(line)
+            if archive.all_institutions and row["institution_id"] != institution_id:
+                continue
+            row["timestamp"] = parse_datetime(row["timestamp"])
+            if start is not None and row["timestamp"] < start:
+                continue
+            if end is not None and row["timestamp"] >= end:
+                continue
+            yield row
+
+
+def _archive_row_key(row):
+    return row["timestamp"], row["id"]
+
+
+def iter_archived_logs(institution_id, start=None, end=None, newest_first=True):
+    """
+    Yield archived audit rows of an institution whose timestamp falls in
+    [start, end). Rows are plain dicts. Only the institution's own files
+    (and files from before archives were split per institution) are read.
+    The parts of a month are streamed with heapq.merge in file order, so
+    oldest-first reads use constant memory; newest_first holds one month of
+    the institution's rows at a time.
+    """
+    archives = AuditLogArchive.objects.filter(Q(institution_id=institution_id) | Q(all_institutions=True))
+    if start is not None:
+        archives = archives.filter(period_end__gt=start)
+    if end is not None:
+        archives = archives.filter(period_start__lt=end)
+
+    # Several parts can exist for one month, merge them before yielding.
+    months = {}
+    for archive in archives:
+        months.setdefault(archive.period_start, []).append(archive)
+
+    for period_start in sorted(months, reverse=newest_first):
+        rows = heapq.merge(
+            *(_iter_archive_file(archive, institution_id, start, end) for archive in months[period_start]),
+            key=_archive_row_key,
+        )
+        if newest_first:
+            yield from reversed(list(rows))
+        else:
+            yield from rows
+
+
+def filter_archived_rows(rows, user_id=None, action=None, content_type_ids=None, search=None, object_id=None):
+    """Apply the list view filters to archived rows."""
+    search = search.lower() if search else None
+    for row in rows:
+        if user_id and str(row["user_id"]) != str(user_id):
+            continue
+        if action and row["action"] != action:
+            continue
+        if content_type_ids is not None and row["content_type_id"] not in content_type_ids:
+            continue
+        if object_id and row["object_id"] != str(object_id):
+            continue
+        if search and search not in (row["description"] or "").lower() \
+                and search not in json.dumps(row["changes"]).lower():
+            continue
+        yield row
+
+
+class HotColdResults:
+    """
+    Hot AuditLog rows followed by archived rows, so a date range spanning
+    both can be paginated like a single queryset. Every hot row is newer
+    than every archived row, which keeps the concatenation ordered.
+    Supports the keyset hooks used by utilities.pagination.KeysetPagination.
+
+    The archived side is a callable archived_source(start, end) yielding
+    rows newest first within [start, end). It is only scanned when a page
+    reaches it, and the cursor timestamp bounds the scan, so a page reads
+    the archive between the cursor and its last row instead of all of it.
+    """
+
+    def __init__(self, hot_queryset, archived_source, reverse=False, predicate=None,
+                 start=None, end=None, skip_archive=False):
+        self.hot = hot_queryset
+        self.archived_source = archived_source
+        self.reverse = reverse
+        self.predicate = predicate
+        self.start = start
+        self.end = end
+        self.skip_archive = skip_archive
+
+    def _clone(self, **kwargs):
+        options = {
+            "hot_queryset": self.hot,
+            "archived_source": self.archived_source,
+            "reverse": self.reverse,
+            "predicate": self.predicate,
+            "start": self.start,
+            "end": self.end,
+            "skip_archive": self.skip_archive,
+        }
+        options.update(kwargs)
+        return HotColdResults(**options)
+
+    def order_by(self, *ordering):
+        # Archived rows are scanned newest first; ascending key means walking backwards
+        reverse = not ordering[-1].startswith("-")
+        return self._clone(hot_queryset=self.hot.order_by(*ordering), reverse=reverse)
+
+    def apply_keyset(self, q, predicate, cursor=None):
+        cursor = cursor or {}
+        start, end, skip_archive = self.start, self.end, self.skip_archive
+        if cursor.get("rank", ARCHIVED_RANK) != ARCHIVED_RANK:
+            # The cursor is a ranked hot row: every archived row comes after it
+            skip_archive = skip_archive or self.reverse
+        elif cursor.get("timestamp") is not None:
+            if self.reverse:
+                start = cursor["timestamp"]
+            else:
+                end = cursor["timestamp"] + timedelta(microseconds=1)
+        return self._clone(
+            hot_queryset=self.hot.filter(q), predicate=predicate,
+            start=start, end=end, skip_archive=skip_archive,
+        )
+
+    def iter_archived(self):
+        if self.skip_archive:
+            return
+        for row in self.archived_source(self.start, self.end):
+            log = AuditLog(**row)
+            # Archived rows never match the full-text index, rank them last
+            log.rank = ARCHIVED_RANK
+            if self.predicate is None or self.predicate(log):
+                yield log
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.start:
+            raise TypeError("HotColdResults only supports slicing from the start.")
+        limit = index.stop
+        if self.reverse:
+            # Walking backwards, the rows next to the cursor are the oldest ones of the scan
+            results = list(reversed(deque(self.iter_archived(), maxlen=limit)))
+            if limit is None or len(results) < limit:
+                remaining = None if limit is None else limit - len(results)
+                results.extend(self.hot[:remaining])
+            return results
+
+        results = list(self.hot[:limit])
+        if limit is None or len(results) < limit:
+            remaining = None if limit is None else limit - len(results)
+            results.extend(islice(self.iter_archived(), remaining))
+        return results
@@ -0,0 +1,15 @@
+from audit.registry import audit_registry
+
+# Framework and bookkeeping tables that never carry user edits
+audit_registry.skip(
+    "audit.AuditLog",
+    "audit.AuditLogArchive",
+    "sessions.Session",
+    "contenttypes.ContentType",
+    "admin.LogEntry",
+    "migrations.Migration",
+)
+audit_registry.skip_app("auditlog")
+audit_registry.skip_app("token_blacklist")
+# Beat rewrites last_run_at/total_run_count on every run
+audit_registry.skip_app("django_celery_beat")
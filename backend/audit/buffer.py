@@ -0,0 +1,239 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .search import build_search_text
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_entry(entry: dict) -> dict:
+    """Make an audit entry JSON safe so it can be handed to a Celery worker."""
+    data = dict(entry)
+    if data.get("timestamp") is not None:
+        data["timestamp"] = data["timestamp"].isoformat()
+    return data
+
+
+def deserialize_entry(data: dict) -> dict:
+    """Inverse of serialize_entry."""
+    entry = dict(data)
+    if isinstance(entry.get("timestamp"), str):
+        entry["timestamp"] = parse_datetime(entry["timestamp"])
+    return entry
+
+
+def write_entries(entries: list) -> None:
+    """Persist a batch of audit entries with a single bulk insert."""
+    from .models import AuditLog
+
+    if not entries:
+        return
+    AuditLog.objects.bulk_create(
+        [AuditLog(**entry) for entry in entries],
+        batch_size=settings.AUDIT_BATCH_MAX_SIZE,
+    )
+
+
+def coalesce_entries(current: dict, new: dict):
+    """
+    Fold a later entry for the same object into `current` and return the
+    net entry, or None when the two cancel out (created then deleted, or
+    updated back to the original values).
+    """
+    if new["action"] == "DELETE":
+        return None if current["action"] == "CREATE" else new
+    if current["action"] == "CREATE":
+        # Updates of an object created in the same transaction are part of its creation
+        return current
+
+    changes = dict(current["changes"] or {})
+    for name, change in (new["changes"] or {}).items():
+        old = changes[name]["old"] if name in changes else change["old"]
+        if old == change["new"]:
+            changes.pop(name, None)
+        else:
+            changes[name] = {"old": old, "new": change["new"]}
+    if not changes:
+        return None
+    merged = dict(new, changes=changes)
+    merged["search_text"] = build_search_text(merged["description"], changes)
+    return merged
+
+
+def diff_entries(written: dict, net, latest: dict):
+    """
+    Entry taking an object from the net entry already written, `written`,
+    to `net`; `latest` is the save that produced `net`. Returns None when
+    there is nothing left to record.
+    """
+    if net is written:
+        return None
+    if net is None:
+        if written["action"] == "CREATE":
+            # The delete that cancelled the creation
+            return latest
+        # Updated back to the original values, record the way back
+        changes = {
+            name: {"old": change["new"], "new": change["old"]}
+            for name, change in (written["changes"] or {}).items()
+        }
+    elif net["action"] != "UPDATE" or written["action"] != "UPDATE":
+        return net
+    else:
+        written_changes = written["changes"] or {}
+        net_changes = net["changes"] or {}
+        changes = {}
+        for name in {**written_changes, **net_changes}:
+            old = written_changes[name]["new"] if name in written_changes else net_changes[name]["old"]
+            new = net_changes[name]["new"] if name in net_changes else written_changes[name]["old"]
+            if old != new:
+                changes[name] = {"old": old, "new": new}
+        if not changes:
+            return None
+    entry = dict(latest, changes=changes)
+    entry["search_text"] = build_search_text(entry["description"], changes)
+    return entry
+
+
+def _is_registered(connection, callback) -> bool:
+    # Callbacks of rolled back savepoints are dropped from run_on_commit
+    return any(hook[1] is callback for hook in connection.run_on_commit)
+
+
+class AuditBuffer:
+    """
+    Collects audit entries and writes them in batches.
+
+    Entries only enter the buffer once the transaction that produced them
+    has committed, so a rolled back save never leaves an audit row behind.
+    Saves of the same object within one transaction are coalesced into a
+    single entry holding the net change. When the buffer is flushed while
+    the commit hooks of a transaction are still running, the later hooks
+    only add the difference to what was written.
+    The buffer is flushed at the end of every request, whenever it reaches
+    AUDIT_BATCH_MAX_SIZE entries, and when the process exits. A write_through
+    buffer has no context end to wait for and writes as soon as an entry
+    is committed.
+    """
+
+    def __init__(self, write_through=False):
+        self.write_through = write_through
+        self._entries = []
+        # (thread, content_type_id, object_id) -> saves of that object awaiting commit
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry: dict) -> None:
+        """Queue an entry once the current transaction commits."""
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            # Autocommit: the save is already committed
+            self._append(entry)
+            return
+
+        key = (threading.get_ident(), entry["content_type_id"], entry["object_id"])
+        with self._lock:
+            group = self._pending.get(key)
+            # Saves undone by a savepoint rollback lost their on_commit hook
+            parts = [p for p in group["parts"] if _is_registered(connection, p["emit"])] if group else []
+            previous = parts[-1]["net"] if parts else None
+            if group is None or (previous is not None and previous["action"] == "DELETE"):
+                # slot: entry of the group in _entries, slot_net: the net entry it stands for,
+                # written: the net entry already flushed by an earlier hook of the commit
+                group = {"parts": [], "slot": None, "slot_net": None, "written": None}
+                self._pending[key] = group
+                parts = []
+                net = entry
+            elif previous is None:
+                net = entry
+            else:
+                net = coalesce_entries(previous, entry)
+
+            # Every save registers its own hook holding the net entry so far,
+            # the last one surviving the commit replaces the earlier ones.
+            part = {"net": net, "entry": entry}
+            part["emit"] = lambda: self._emit(key, group, part)
+            group["parts"] = parts + [part]
+        transaction.on_commit(part["emit"])
+
+    def _emit(self, key, group, part) -> None:
+        with self._lock:
+            if self._pending.get(key) is group:
+                del self._pending[key]
+            slot = group["slot"]
+            index = next((i for i, e in enumerate(self._entries) if e is slot), None) if slot is not None else None
+            if slot is not None and index is None:
+                # Flushed by an earlier hook of this commit, that state is persisted
+                group["written"] = group["slot_net"]
+            entry = part["net"]
+            if group["written"] is not None:
+                entry = diff_entries(group["written"], part["net"], part["entry"])
+            if index is None:
+                if entry is not None:
+                    self._entries.append(entry)
+            elif entry is None:
+                del self._entries[index]
+            else:
+                self._entries[index] = entry
+            group["slot"] = entry
+            group["slot_net"] = part["net"]
+            full = self.write_through or len(self._entries) >= settings.AUDIT_BATCH_MAX_SIZE
+        if full:
+            self.flush()
+
+    def _append(self, entry: dict) -> None:
+        with self._lock:
+            self._entries.append(entry)
+            full = self.write_through or len(self._entries) >= settings.AUDIT_BATCH_MAX_SIZE
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out everything queued so far."""
+        self._discard_rolled_back()
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return
+
+        if settings.AUDIT_ASYNC_WRITES:
+            from .tasks import write_audit_entries
+
+            try:
+                write_audit_entries.delay([serialize_entry(e) for e in entries])
+                return
+            except Exception as e:
+                logger.warning(f"Could not queue audit entries, writing inline: {str(e)}")
+
+        try:
+            write_entries(entries)
+        except Exception as e:
+            logger.error(f"Failed to write {len(entries)} audit entries: {str(e)}")
+
+    def _discard_rolled_back(self) -> None:
+        """Forget pending saves of this thread whose transaction was rolled back."""
+        connection = transaction.get_connection()
+        thread = threading.get_ident()
+        with self._lock:
+            stale = [
+                key for key, group in self._pending.items()
+                if key[0] == thread and not any(_is_registered(connection, p["emit"]) for p in group["parts"])
+            ]
+            for key in stale:
+                del self._pending[key]
+
+
+# Used outside requests and tasks (beat, shell, management commands), where
+# nothing would flush it on time, so entries are written once committed.
+audit_buffer = AuditBuffer(write_through=True)
+
+# Never lose queued entries when a worker or management command exits.
+atexit.register(audit_buffer.flush)
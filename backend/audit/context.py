@@ -0,0 +1,78 @@
+import contextvars
+import threading
+import weakref
+
+from .buffer import AuditBuffer, audit_buffer
+
+_current_context = contextvars.ContextVar("audit_context", default=None)
+
+# Live contexts, only used to report metrics. Weak references so a leaked
+# context never stays alive because of this registry.
+_live_contexts = weakref.WeakSet()
+_live_contexts_lock = threading.Lock()
+
+
+class AuditContext:
+    """
+    Audit state for a single request or Celery task.
+
+    Holds the request (for user/institution lookup) and a private buffer
+    of pending entries. The buffer is capped at AUDIT_BATCH_MAX_SIZE and
+    everything is flushed and dropped when the context ends.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.buffer = AuditBuffer()
+
+
+def begin_context(request=None):
+    """Start a new audit context and return the token needed to end it."""
+    context = AuditContext(request)
+    with _live_contexts_lock:
+        _live_contexts.add(context)
+    return _current_context.set(context)
+
+
+def end_context(token):
+    """Flush the pending entries of the current context and reset it."""
+    context = _current_context.get()
+    try:
+        if context is not None:
+            context.buffer.flush()
+    finally:
+        _current_context.reset(token)
+        if context is not None:
+            with _live_contexts_lock:
+                _live_contexts.discard(context)
+
+
+def get_current_context():
+    return _current_context.get()
+
+
+def get_current_request():
+    context = _current_context.get()
+    return context.request if context else None
+
+
+def get_current_buffer():
+    """Buffer of the active context, or the write-through process wide one outside requests and tasks."""
+    context = _current_context.get()
+    return context.buffer if context else audit_buffer
+
+
+def get_tracker_metrics() -> dict:
+    """
+    Report how much audit state this process is holding, to keep an eye
+    on memory growth of long-lived workers.
+    """
+    with _live_contexts_lock:
+        contexts = list(_live_contexts)
+    current = _current_context.get()
+    return {
+        "active_contexts": len(contexts),
+        "pending_entries": sum(len(c.buffer) for c in contexts) + len(audit_buffer),
+        "process_buffer_size": len(audit_buffer),
+        "current_context_size": len(current.buffer) if current else 0,
+    }
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from audit.archive import archive_audit_logs, get_archive_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Archives audit logs older than N months into gzip-compressed NDJSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=settings.AUDIT_HOT_MONTHS,
+            help='Number of recent months to keep in the audit log table',
+        )
+
+    def handle(self, *args, **options):
+        months = options['months']
+        self.stdout.write(f"Archiving audit logs older than {get_archive_cutoff(months):%Y-%m-%d}...")
+
+        archives = archive_audit_logs(months)
+        for archive in archives:
+            self.stdout.write(f"Wrote {archive.file_name} ({archive.row_count} rows).")
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully archived {len(archives)} audit log file(s)!'))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+def backfill_search_text(apps, schema_editor):
+    from audit.search import build_search_text
+
+    AuditLog = apps.get_model('audit', 'AuditLog')
+    batch = []
+    for log in AuditLog.objects.only('id', 'description', 'changes').iterator(chunk_size=2000):
+        log.search_text = build_search_text(log.description, log.changes)
+        batch.append(log)
+        if len(batch) >= 2000:
+            AuditLog.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        AuditLog.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_index(apps, schema_editor):
+    from audit.search import POSTGRES_INDEX_NAME, ensure_sqlite_fts, search_vector
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+
+        AuditLog = apps.get_model('audit', 'AuditLog')
+        schema_editor.add_index(AuditLog, GinIndex(search_vector(), name=POSTGRES_INDEX_NAME))
+    elif vendor == 'sqlite':
+        ensure_sqlite_fts(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from audit.search import POSTGRES_INDEX_NAME, SQLITE_FTS_TABLE
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRES_INDEX_NAME}')
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0003_auditlogarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Description and changed field names/values, indexed for full-text search.'),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
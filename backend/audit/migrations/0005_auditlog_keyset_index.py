@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_auditlog_search_text'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='audit_audit_institu_b792a5_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['institution', 'timestamp', 'id'], name='audit_inst_ts_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def mark_shared_archives(apps, schema_editor):
+    # Files written so far hold the rows of every institution
+    AuditLogArchive = apps.get_model('audit', 'AuditLogArchive')
+    AuditLogArchive.objects.update(all_institutions=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0005_auditlog_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlogarchive',
+            name='institution_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlogarchive',
+            name='all_institutions',
+            field=models.BooleanField(default=False, help_text='File written before archives were split per institution.'),
+        ),
+        migrations.RunPython(mark_shared_archives, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auditlogarchive',
+            index=models.Index(fields=['institution_id', 'period_start'], name='audit_archive_inst_period_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.utils import timezone
 
 class AuditLog(models.Model):
     ACTION_CHOICES = [
@@ -21,19 +22,52 @@ class AuditLog(models.Model):
         'institution.Institution', on_delete=models.SET_NULL, null=True, blank=True,
         help_text="Institution associated with this audit log."
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the change happens, not when the buffered entry is written.
+    timestamp = models.DateTimeField(default=timezone.now)
     changes = models.JSONField(
         null=True, blank=True, help_text="Details of changes made (for updates)."
     )
     description = models.TextField(
         blank=True, help_text="Human-readable description of the action."
     )
+    search_text = models.TextField(
+        blank=True, default="", editable=False,
+        help_text="Description and changed field names/values, indexed for full-text search."
+    )
 
     class Meta:
         ordering = ["-timestamp"]
         indexes = [
-            models.Index(fields=['institution', 'timestamp']),
+            models.Index(fields=['institution', 'timestamp', 'id'], name='audit_inst_ts_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} on {self.content_type.model} (ID: {self.object_id}) by {self.user} at {self.timestamp}"
+
+
+class AuditLogArchive(models.Model):
+    """
+    One compressed NDJSON file holding the audit rows of one institution
+    and month moved out of the hot AuditLog table. A month can be archived
+    in several parts when late rows arrive after it was first archived.
+    """
+    # Plain id rather than a foreign key, the files outlive the institution
+    institution_id = models.BigIntegerField(null=True, blank=True)
+    all_institutions = models.BooleanField(
+        default=False, help_text="File written before archives were split per institution."
+    )
+    period_start = models.DateTimeField(db_index=True)
+    period_end = models.DateTimeField()
+    file_name = models.CharField(max_length=255, unique=True)
+    row_count = models.PositiveIntegerField(default=0)
+    checksum = models.CharField(max_length=64, help_text="SHA-256 of the uncompressed content.")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-period_start"]
+        indexes = [
+            models.Index(fields=['institution_id', 'period_start'], name='audit_archive_inst_period_idx'),
         ]
 
     def __str__(self):
-        return f"{self.action} on {self.content_type.model} (ID: {self.object_id}) by {self.user} at {self.timestamp}"
\ No newline at end of file
+        return f"{self.file_name} ({self.row_count} rows)"
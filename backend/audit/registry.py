@@ -0,0 +1,164 @@
+import random
+
+AUDITED_ACTIONS = ("CREATE", "UPDATE", "DELETE")
+
+# Columns used to label an audited object when its model declares no label
+DEFAULT_LABEL_FIELDS = (
+    "name", "title", "task_name", "project_name", "institution_name", "branch_name",
+    "document_title", "status_name", "fullname", "email", "code",
+)
+
+
+class AuditPolicy:
+    """
+    What the audit trail records for a model.
+
+    fields: field names recorded in `changes`, None for every concrete field.
+    exclude_fields: fields never recorded; an update that only touches these
+        produces no audit entry.
+    bookkeeping_fields: fields that are recorded, but an update that only
+        touches these is bookkeeping and is kept for a fraction
+        `bookkeeping_sample_rate` of the saves (0 skips them all).
+    actions: which of CREATE / UPDATE / DELETE are logged.
+    """
+
+    def __init__(
+        self,
+        audited=True,
+        fields=None,
+        exclude_fields=(),
+        bookkeeping_fields=(),
+        bookkeeping_sample_rate=0.0,
+        actions=AUDITED_ACTIONS,
+    ):
+        self.audited = audited
+        self.fields = set(fields) if fields is not None else None
+        self.exclude_fields = set(exclude_fields)
+        self.bookkeeping_fields = set(bookkeeping_fields)
+        self.bookkeeping_sample_rate = bookkeeping_sample_rate
+        self.actions = frozenset(actions)
+
+
+class ModelAuditPolicy:
+    """An AuditPolicy resolved against one concrete model, built once per model."""
+
+    def __init__(self, model, policy, global_exclude_fields=(), label=None):
+        self.model = model
+        self.label_func = label
+        field_attnames = {field.name: field.attname for field in model._meta.concrete_fields}
+        self.label_attnames = [field_attnames[name] for name in DEFAULT_LABEL_FIELDS if name in field_attnames]
+        self.audited = policy.audited
+        self.actions = policy.actions if policy.audited else frozenset()
+        excluded = policy.exclude_fields | set(global_exclude_fields)
+        self.tracked_fields = [
+            field for field in model._meta.concrete_fields
+            if (policy.fields is None or field.name in policy.fields)
+            and field.name not in excluded
+            and field.attname not in excluded
+        ] if policy.audited else []
+        self.bookkeeping_fields = frozenset(policy.bookkeeping_fields)
+        self.bookkeeping_sample_rate = policy.bookkeeping_sample_rate
+
+    def label(self, instance) -> str:
+        """
+        Short description of an instance built from columns already loaded
+        on it. Unlike str(instance) this never loads a relation.
+        """
+        if self.label_func is not None:
+            return self.label_func(instance)
+        for attname in self.label_attnames:
+            value = instance.__dict__.get(attname)
+            if value not in (None, ""):
+                return str(value)
+        return f"#{instance.pk}"
+
+    def logs(self, action) -> bool:
+        return action in self.actions
+
+    def is_bookkeeping(self, changes) -> bool:
+        return bool(self.bookkeeping_fields) and all(name in self.bookkeeping_fields for name in changes)
+
+    def should_log_update(self, changes) -> bool:
+        if not changes or not self.logs("UPDATE"):
+            return False
+        if self.is_bookkeeping(changes):
+            return random.random() < self.bookkeeping_sample_rate
+        return True
+
+
+class AuditRegistry:
+    """
+    Per-model audit policies declared by each app in its `audit_policies`
+    module. Models can be given as classes (abstract bases apply to every
+    subclass) or "app_label.ModelName" labels. Lookups are cached per model
+    class so the signal receivers never resolve a policy twice.
+    """
+
+    def __init__(self, global_exclude_fields=()):
+        self.global_exclude_fields = tuple(global_exclude_fields)
+        self.default_policy = AuditPolicy()
+        self._policies = {}
+        self._app_policies = {}
+        self._labels = {}
+        self._resolved = {}
+
+    def register(self, *models, **options) -> AuditPolicy:
+        policy = AuditPolicy(**options)
+        for model in models:
+            self._policies[self._key(model)] = policy
+        self._resolved.clear()
+        return policy
+
+    def skip(self, *models) -> AuditPolicy:
+        return self.register(*models, audited=False)
+
+    def register_label(self, model, label):
+        """
+        Label function for a model's audit descriptions. It receives the
+        instance and must only read loaded columns (foreign keys by their
+        `_id` attribute), never relations.
+        """
+        self._labels[self._key(model)] = label
+        self._resolved.clear()
+
+    def register_app(self, app_label, **options) -> AuditPolicy:
+        """Default policy for the models of an app that have none of their own."""
+        policy = AuditPolicy(**options)
+        self._app_policies[app_label] = policy
+        self._resolved.clear()
+        return policy
+
+    def skip_app(self, app_label) -> AuditPolicy:
+        return self.register_app(app_label, audited=False)
+
+    def get_policy(self, model) -> ModelAuditPolicy:
+        resolved = self._resolved.get(model)
+        if resolved is None:
+            resolved = ModelAuditPolicy(
+                model,
+                self._lookup(model, self._policies) or self._app_policies.get(model._meta.app_label, self.default_policy),
+                self.global_exclude_fields,
+                label=self._lookup(model, self._labels),
+            )
+            self._resolved[model] = resolved
+        return resolved
+
+    def _key(self, model):
+        if isinstance(model, str):
+            return model.lower()
+        return model
+
+    def _lookup(self, model, registered):
+        # The model itself first, then its bases, so subclasses can override
+        for klass in model.__mro__:
+            meta = getattr(klass, "_meta", None)
+            if meta is None:
+                continue
+            value = registered.get(klass) or registered.get(meta.label_lower)
+            if value is not None:
+                return value
+        return None
+
+
+# auto_now timestamps change on every save and say nothing about the edit
+audit_registry = AuditRegistry(global_exclude_fields=("updated_at",))
@@ -0,0 +1,121 @@
+from django.db import connection, connections
+from django.db.models import BigIntegerField, F, Value
+from django.db.models.functions import Cast
+from django.db.models.expressions import RawSQL
+
+# Text search configuration used both by the Postgres index and the queries,
+# they must match for the GIN index to be used.
+SEARCH_CONFIG = "simple"
+POSTGRES_INDEX_NAME = "auditlog_search_gin"
+
+# Ranks are scaled to integers: float scores don't survive the round trip
+# through a pagination cursor exactly, so keyset comparisons could skip or
+# repeat rows.
+RANK_SCALE = 1000000
+
+SQLITE_FTS_TABLE = "audit_auditlog_fts"
+SQLITE_FTS_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} "
+    f"USING fts5(search_text, content='audit_auditlog', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON audit_auditlog BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON audit_auditlog BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE ON audit_auditlog BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+]
+
+
+def build_search_text(description, changes) -> str:
+    """Flatten the description and changed field names/values into one searchable string."""
+    parts = [description or ""]
+    for field_name, change in (changes or {}).items():
+        parts.append(field_name)
+        if isinstance(change, dict):
+            parts.extend(str(value) for value in change.values() if value is not None)
+        elif change is not None:
+            parts.append(str(change))
+    return " ".join(part for part in parts if part)
+
+
+def search_vector():
+    # django.contrib.postgres needs psycopg, only import it when running on Postgres
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("search_text", config=SEARCH_CONFIG)
+
+
+def ensure_sqlite_fts(conn) -> None:
+    """
+    Create the FTS5 index used for development on SQLite.
+    Safe to run repeatedly; Django drops the triggers whenever it remakes
+    the audit table during a migration, so this also runs after migrate.
+    """
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+            [f"{SQLITE_FTS_TABLE}_ai"],
+        )
+        triggers_missing = cursor.fetchone() is None
+        for statement in SQLITE_FTS_STATEMENTS:
+            cursor.execute(statement)
+        if triggers_missing:
+            cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def ensure_search_index(sender=None, using="default", **kwargs):
+    """post_migrate receiver restoring the SQLite FTS objects."""
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        if "audit_auditlog" not in conn.introspection.table_names(cursor):
+            return
+        columns = [c.name for c in conn.introspection.get_table_description(cursor, "audit_auditlog")]
+    if "search_text" in columns:
+        ensure_sqlite_fts(conn)
+
+
+def _sqlite_match_expression(query: str) -> str:
+    # Quote every term so user input can't be read as FTS5 query syntax.
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+
+def apply_search(queryset, query: str):
+    """
+    Filter audit logs by full-text search and annotate an integer `rank`
+    where a higher value is a better match. Uses the GIN index on Postgres and
+    the FTS5 table on SQLite; other backends fall back to a substring match.
+    """
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return queryset.alias(search=search_vector()).filter(
+            search=search_query
+        ).annotate(
+            rank=Cast(SearchRank(F("search"), search_query) * RANK_SCALE, BigIntegerField())
+        )
+
+    if connection.vendor == "sqlite":
+        match = _sqlite_match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            # bm25() is lower for better matches, negate it to sort like Postgres
+            rank=RawSQL(
+                f"SELECT CAST(-bm25({SQLITE_FTS_TABLE}) * {RANK_SCALE} AS INTEGER) FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = audit_auditlog.id",
+                [match],
+                output_field=BigIntegerField(),
+            )
+        )
+
+    return queryset.filter(search_text__icontains=query).annotate(
+        rank=Value(0, output_field=BigIntegerField())
+    )
@@ -8,7 +8,8 @@ class AuditLogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AuditLog
-        fields = '__all__'
+        # search_text only feeds the full-text index, it repeats description and changes
+        exclude = ['search_text']
     
     def get_institution(self, obj):
         if obj.institution:
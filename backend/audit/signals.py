@@ -1,134 +1,218 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete, post_init
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 from django.apps import apps
-from .models import AuditLog
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Model
+from django.utils import timezone
+from .search import build_search_text
+from .registry import audit_registry
+from .context import begin_context, end_context, get_current_buffer, get_current_request
 from django.contrib.auth import get_user_model
+import copy
+import functools
 import json
 
 User = get_user_model()
 
-# Store instance state before saving to track changes
-def get_instance_changes(instance, old_instance=None):
+_SNAPSHOT_ATTR = "_audit_snapshot"
+
+
+def take_snapshot(instance, fields=None):
+    """
+    Remember the current column values of an instance.
+    Only values already loaded on the instance are read, deferred fields
+    and relations are never fetched.
     """
-    Compare old and new instance to detect changes for UPDATE actions.
+    snapshot = getattr(instance, _SNAPSHOT_ATTR, None)
+    if snapshot is None or fields is None:
+        snapshot = {}
+    for field in audit_registry.get_policy(type(instance)).tracked_fields:
+        if fields is not None and field.name not in fields and field.attname not in fields:
+            continue
+        if field.attname in instance.__dict__:
+            value = instance.__dict__[field.attname]
+            snapshot[field.attname] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+    instance.__dict__[_SNAPSHOT_ATTR] = snapshot
+
+
+def get_instance_changes(instance, update_fields=None):
+    """
+    Compare the instance against the snapshot taken when it was loaded
+    (or last saved) to detect changes for UPDATE actions.
+    Only the fields tracked by the model's audit policy are compared, and
+    when update_fields is given only those of them.
     Returns a dictionary of changed fields.
     """
     changes = {}
-    if old_instance:
-        for field in instance._meta.fields:
-            field_name = field.name
-            old_value = getattr(old_instance, field_name, None)
-            new_value = getattr(instance, field_name, None)
-            if old_value != new_value:
-                changes[field_name] = {
-                    "old": str(old_value),
-                    "new": str(new_value),
-                }
+    snapshot = getattr(instance, _SNAPSHOT_ATTR, None)
+    if not snapshot:
+        return changes
+    for field in audit_registry.get_policy(type(instance)).tracked_fields:
+        if update_fields is not None and field.name not in update_fields and field.attname not in update_fields:
+            continue
+        if field.attname not in snapshot or field.attname not in instance.__dict__:
+            continue
+        old_value = snapshot[field.attname]
+        new_value = instance.__dict__[field.attname]
+        if old_value != new_value:
+            if field.is_relation:
+                old_value, new_value = get_related_labels(instance, field, old_value, new_value)
+            changes[field.name] = {
+                "old": str(old_value),
+                "new": str(new_value),
+            }
     return changes
 
-# Store old instance for UPDATE tracking
-_instance_tracker = {}
 
-@receiver(pre_save)
-def store_old_instance(sender, instance, **kwargs):
+def get_related_labels(instance, field, old_value, new_value) -> tuple:
     """
-    Store the old instance before saving to track changes for UPDATE.
+    Related objects behind a changed foreign key, so the change shows them
+    rather than raw ids. Only changed keys are resolved, with one query for
+    both sides, and the object already cached on the instance is reused.
     """
-    # Exclude specific models from auditing
-    excluded_models = ['auditlog', 'session', 'migration', 'contenttype', 'logentry']
-    if sender._meta.model_name.lower() in excluded_models:
-        return
-    if instance.pk:
-        try:
-            _instance_tracker[instance] = sender.objects.get(pk=instance.pk)
-        except sender.DoesNotExist:
-            _instance_tracker[instance] = None
+    objects = {}
+    cached = field.get_cached_value(instance, default=None)
+    if cached is not None and getattr(cached, field.target_field.attname) == new_value:
+        objects[new_value] = cached
+    missing = {value for value in (old_value, new_value) if value is not None and value not in objects}
+    if missing:
+        objects.update(field.related_model._base_manager.in_bulk(missing, field_name=field.target_field.attname))
+    return tuple(objects.get(value, value) for value in (old_value, new_value))
 
-@receiver(post_save)
-def log_save_action(sender, instance, created, **kwargs):
+
+def snapshot_after_refresh(refresh_from_db):
     """
-    Automatically log CREATE and UPDATE actions for all models except excluded ones.
+    Wrap Model.refresh_from_db so reloaded values become the new snapshot,
+    post_init only runs for the throwaway instance the values are read from.
     """
-    # Exclude specific models from auditing
-    excluded_models = ['auditlog', 'session', 'migration', 'contenttype', 'logentry']
-    if sender._meta.model_name.lower() in excluded_models:
-        return
+    @functools.wraps(refresh_from_db)
+    def wrapper(self, using=None, fields=None, *args, **kwargs):
+        refresh_from_db(self, using, fields, *args, **kwargs)
+        if self.pk is not None and audit_registry.get_policy(type(self)).logs("UPDATE"):
+            take_snapshot(self, fields)
+    wrapper.audit_snapshot = True
+    return wrapper
 
-    action = "CREATE" if created else "UPDATE"
-    user = None
-    institution = None
+
+def install_refresh_snapshot():
+    if not getattr(Model.refresh_from_db, "audit_snapshot", False):
+        Model.refresh_from_db = snapshot_after_refresh(Model.refresh_from_db)
+
+def get_current_actor():
+    """
+    (user_id, institution_id) of the current request. Only the profile is
+    loaded, once per request, the institution is read from its column.
+    """
     request = get_current_request()  # From middleware
-    if request and hasattr(request, 'user') and request.user.is_authenticated:
-        user = request.user
-        # Get institution from user profile
-        if hasattr(user, 'profile') and hasattr(user.profile, 'institution'):
-            institution = user.profile.institution
+    user = getattr(request, "user", None) if request else None
+    if user is None or not user.is_authenticated:
+        return None, None
+    try:
+        institution_id = user.profile.institution_id
+    except ObjectDoesNotExist:
+        institution_id = None
+    return user.id, institution_id
+
+@receiver(post_init)
+def store_initial_state(sender, instance, **kwargs):
+    """
+    Snapshot field values when an instance is loaded so UPDATE changes can be
+    computed without reading the row again before saving.
+    """
+    if instance.pk is not None and audit_registry.get_policy(sender).logs("UPDATE"):
+        take_snapshot(instance)
 
-    changes = {}
-    description = f"{action.title()}d {sender._meta.model_name}: {str(instance)}"
+@receiver(post_save)
+def log_save_action(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Automatically log CREATE and UPDATE actions as allowed by the model's audit policy.
+    """
+    policy = audit_registry.get_policy(sender)
+    if not policy.audited:
+        return
 
+    action = "CREATE" if created else "UPDATE"
     if action == "UPDATE":
-        old_instance = _instance_tracker.get(instance)
-        changes = get_instance_changes(instance, old_instance)
+        changes = get_instance_changes(instance, update_fields)
         if not changes:
             return  # Skip logging if no changes detected
+        # Later saves of the same instance are diffed against this state
+        take_snapshot(instance, update_fields)
+        if not policy.should_log_update(changes):
+            return  # Bookkeeping-only update
+    else:
+        changes = {}
+        take_snapshot(instance)
+        if not policy.logs(action):
+            return
+
+    user_id, institution_id = get_current_actor()
+    description = f"{action.title()}d {sender._meta.model_name}: {policy.label(instance)}"
+    get_current_buffer().add({
+        "content_type_id": ContentType.objects.get_for_model(sender).id,
+        "object_id": str(instance.pk),
+        "action": action,
+        "user_id": user_id,
+        "institution_id": institution_id,
+        "description": description,
+        "changes": changes if changes else None,
+        "search_text": build_search_text(description, changes),
+        "timestamp": timezone.now(),
+    })
+
+def log_bulk_create(model, instances):
+    """
+    Record CREATE entries for rows inserted with bulk_create, which sends
+    no post_save signal. The instances must have their primary key set.
+    """
+    for instance in instances:
+        log_save_action(model, instance, created=True)
 
-    AuditLog.objects.create(
-        content_type=ContentType.objects.get_for_model(sender),
-        object_id=instance.pk,
-        action=action,
-        user=user,
-        institution=institution,
-        description=description,
-        changes=changes if changes else None,
-    )
-
-    # Clean up tracker
-    if instance in _instance_tracker:
-        del _instance_tracker[instance]
+def log_bulk_update(model, instances, fields):
+    """
+    Record UPDATE entries for rows written with bulk_update, which sends
+    no post_save signal. Changes are diffed against each instance's snapshot.
+    """
+    for instance in instances:
+        log_save_action(model, instance, created=False, update_fields=fields)
 
 @receiver(post_delete)
 def log_delete_action(sender, instance, **kwargs):
     """
-    Automatically log DELETE actions for all models except excluded ones.
+    Automatically log DELETE actions as allowed by the model's audit policy.
     """
-    # Exclude specific models from auditing
-    excluded_models = ['auditlog', 'session', 'migration', 'contenttype', 'logentry']
-    if sender._meta.model_name.lower() in excluded_models:
+    policy = audit_registry.get_policy(sender)
+    if not policy.logs("DELETE"):
         return
 
-    user = None
-    institution = None
-    request = get_current_request()  # From middleware
-    if request and hasattr(request, 'user') and request.user.is_authenticated:
-        user = request.user
-        # Get institution from user profile
-        if hasattr(user, 'profile') and hasattr(user.profile, 'institution'):
-            institution = user.profile.institution
-
-    AuditLog.objects.create(
-        content_type=ContentType.objects.get_for_model(sender),
-        object_id=instance.pk,
-        action="DELETE",
-        user=user,
-        institution=institution,
-        description=f"Deleted {sender._meta.model_name}: {str(instance)}",
-    )
-
-# Middleware to pass request context
-from threading import local
-
-_request_local = local()
-
-def get_current_request():
-    return getattr(_request_local, 'request', None)
+    user_id, institution_id = get_current_actor()
+    description = f"Deleted {sender._meta.model_name}: {policy.label(instance)}"
+    get_current_buffer().add({
+        "content_type_id": ContentType.objects.get_for_model(sender).id,
+        "object_id": str(instance.pk),
+        "action": "DELETE",
+        "user_id": user_id,
+        "institution_id": institution_id,
+        "description": description,
+        "changes": None,
+        "search_text": build_search_text(description, None),
+        "timestamp": timezone.now(),
+    })
 
 class RequestMiddleware:
+    """
+    Opens an audit context for the duration of each request. The context
+    is reset when the request ends, even if the view raised.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        _request_local.request = request
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+        token = begin_context(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            # One bulk insert for every audit entry produced by this request
+            end_context(token)
+        return response
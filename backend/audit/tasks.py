@@ -0,0 +1,45 @@
+from celery import shared_task
+from celery.signals import task_prerun, task_postrun, worker_process_shutdown
+from audit.buffer import audit_buffer, deserialize_entry, write_entries
+from audit.context import begin_context, end_context
+
+# Audit context tokens of the tasks currently running in this worker
+_task_context_tokens = {}
+
+
+@shared_task
+def write_audit_entries(entries):
+    """
+    Celery task that persists a batch of buffered audit entries.
+    """
+    write_entries([deserialize_entry(entry) for entry in entries])
+
+
+@shared_task
+def archive_old_audit_logs(months=None):
+    """
+    Celery beat task that moves audit months older than AUDIT_HOT_MONTHS
+    to compressed archive files.
+    """
+    from audit.archive import archive_audit_logs
+
+    archives = archive_audit_logs(months)
+    return [archive.file_name for archive in archives]
+
+
+@task_prerun.connect
+def open_audit_context_for_task(task_id=None, **kwargs):
+    _task_context_tokens[task_id] = begin_context()
+
+
+@task_postrun.connect
+def close_audit_context_for_task(task_id=None, **kwargs):
+    # Saves made inside a task are not tied to a request, flush them here.
+    token = _task_context_tokens.pop(task_id, None)
+    if token is not None:
+        end_context(token)
+
+
+@worker_process_shutdown.connect
+def flush_audit_buffer_on_shutdown(**kwargs):
+    audit_buffer.flush()
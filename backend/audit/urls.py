@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import AuditLogListApiView
+from .views import AuditLogListApiView, AuditLogExportApiView, AuditTrackerMetricsApiView
 
 urlpatterns = [
     path("auditlogs/", AuditLogListApiView.as_view(), name="auditlogs"),
+    path("auditlogs/export/", AuditLogExportApiView.as_view(), name="auditlog-export"),
+    path("auditlogs/metrics/", AuditTrackerMetricsApiView.as_view(), name="auditlog-metrics"),
 ]
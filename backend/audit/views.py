@@ -1,25 +1,40 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from drf_spectacular.utils import extend_schema
-from django.db.models import Q
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+import csv
+import json
+from itertools import islice
 from .serializers import AuditLogSerializer
 from .models import AuditLog
+from .context import get_tracker_metrics
+from .search import apply_search
+from .archive import (
+    HotColdResults, filter_archived_rows, iter_archived_logs, range_reaches_archive
+)
 from users.models import Profile
-from utilities.pagination import CustomPageNumberPagination
+from utilities.pagination import KeysetPagination
 
-class AuditLogListApiView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-    allowed_ordering_fields = ['timestamp']
-    default_ordering = ['-timestamp']
+User = get_user_model()
 
-    @extend_schema(
-        responses={200: AuditLogSerializer(many=True)},
-        description="Retrieve audit logs for an institution with optional filters.",
-        summary="Get audit logs",
-        tags=["Audit Log Management"],
-    )
-    def get(self, request):
+class AuditLogFilterMixin:
+    """
+    Shared filtering for the audit log list and export endpoints.
+    Returns (hot_queryset, archived_source, error_response); archived_source
+    is None unless the requested date range reaches into archived months.
+    Otherwise it is a callable (start=None, end=None, newest_first=True)
+    yielding the matching archived rows, optionally narrowed to [start, end).
+    """
+
+    def filter_auditlogs(self, request, institution):
         search_query = request.query_params.get("search", None)
         user_id = request.query_params.get("user", None)
         action = request.query_params.get("action", None)
@@ -28,42 +43,215 @@ class AuditLogListApiView(APIView):
         content_type = request.query_params.get("content_type")
         object_id = request.query_params.get("object_id")
 
-        try:
-            user_institution = request.user.profile.institution
-        except Profile.DoesNotExist:
-            return Response(
-                {"error": "Logged-in user does not have a profile."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        auditlogs = AuditLog.objects.filter(institution=user_institution)
+        auditlogs = AuditLog.objects.filter(institution=institution)
 
         if user_id:
             auditlogs = auditlogs.filter(user_id=user_id)
 
         if action:
             if action not in dict(AuditLog.ACTION_CHOICES):
-                return Response({"error": f"Invalid action '{action}'"}, status=400)
+                return None, None, Response({"error": f"Invalid action '{action}'"}, status=400)
             auditlogs = auditlogs.filter(action=action)
 
         if content_type:
             auditlogs = auditlogs.filter(content_type__model=content_type.lower())
 
+        try:
+            parsed_start_date = parse_date(start_date) if start_date else None
+            parsed_end_date = parse_date(end_date) if end_date else None
+        except ValueError:
+            parsed_start_date = parsed_end_date = None
+        if (start_date and not parsed_start_date) or (end_date and not parsed_end_date):
+            return None, None, Response({"error": "Dates must use the YYYY-MM-DD format."}, status=400)
+
         if start_date:
             auditlogs = auditlogs.filter(timestamp__date__gte=start_date)
         if end_date:
             auditlogs = auditlogs.filter(timestamp__date__lte=end_date)
 
         if search_query:
-            auditlogs = auditlogs.filter(
-                Q(description__icontains=search_query) |
-                Q(changes__icontains=search_query)
-            )
-        
+            auditlogs = apply_search(auditlogs, search_query)
+
         if object_id:
             auditlogs = auditlogs.filter(object_id=object_id)
 
-        paginator = CustomPageNumberPagination()
-        paginated_logs = paginator.paginate_queryset(auditlogs, request)
+        archived_source = None
+        if range_reaches_archive(parsed_start_date):
+            # Older months live in compressed archive files
+            range_start = None
+            if parsed_start_date:
+                range_start = timezone.make_aware(datetime.combine(parsed_start_date, time.min))
+            range_end = None
+            if parsed_end_date:
+                range_end = timezone.make_aware(datetime.combine(parsed_end_date + timedelta(days=1), time.min))
+            content_type_ids = None
+            if content_type:
+                content_type_ids = set(
+                    ContentType.objects.filter(model=content_type.lower()).values_list("id", flat=True)
+                )
+            institution_id = institution.id if institution else None
+
+            def archived_source(start=None, end=None, newest_first=True):
+                # Narrow the requested range, a pagination cursor only ever shrinks it
+                if range_start is not None:
+                    start = range_start if start is None else max(start, range_start)
+                if range_end is not None:
+                    end = range_end if end is None else min(end, range_end)
+                return filter_archived_rows(
+                    iter_archived_logs(institution_id, start, end, newest_first=newest_first),
+                    user_id=user_id,
+                    action=action,
+                    content_type_ids=content_type_ids,
+                    search=search_query,
+                    object_id=object_id,
+                )
+
+        return auditlogs, archived_source, None
+
+
+class AuditLogListApiView(APIView, AuditLogFilterMixin):
+    permission_classes = [permissions.IsAuthenticated]
+    allowed_ordering_fields = ['timestamp']
+    default_ordering = ['-timestamp']
+
+    @extend_schema(
+        responses={200: AuditLogSerializer(many=True)},
+        description="Retrieve audit logs for an institution with optional filters. Results are cursor paginated: follow the `next`/`previous` links. Archived months are searched when the date range reaches into them, which includes any request without start_date.",
+        summary="Get audit logs",
+        tags=["Audit Log Management"],
+    )
+    def get(self, request):
+        try:
+            user_institution = request.user.profile.institution
+        except Profile.DoesNotExist:
+            return Response(
+                {"error": "Logged-in user does not have a profile."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        auditlogs, archived_source, error = self.filter_auditlogs(request, user_institution)
+        if error:
+            return error
+
+        results = auditlogs
+        if archived_source is not None:
+            results = HotColdResults(auditlogs, archived_source)
+
+        if request.query_params.get("search"):
+            paginator = KeysetPagination(ordering=("-rank", "-timestamp", "-id"))
+        else:
+            paginator = KeysetPagination(ordering=("-timestamp", "-id"))
+        paginated_logs = paginator.paginate_queryset(results, request)
         serializer = AuditLogSerializer(paginated_logs, many=True)
         return paginator.get_paginated_response(serializer.data)
+
+
+class AuditLogExportApiView(APIView, AuditLogFilterMixin):
+    permission_classes = [permissions.IsAuthenticated]
+    export_fields = [
+        "id", "timestamp", "action", "content_type_id", "content_type__model", "object_id",
+        "user_id", "user__fullname", "institution_id", "description", "changes",
+    ]
+    chunk_size = 2000
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='export_format', type=str, location=OpenApiParameter.QUERY, required=False, description='ndjson (default) or csv'),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+        description="Stream every audit log of the institution matching the list filters as NDJSON or CSV, oldest first. Without start_date the archived months are included.",
+        summary="Export audit logs",
+        tags=["Audit Log Management"],
+    )
+    def get(self, request):
+        export_format = request.query_params.get("export_format", "ndjson").lower()
+        if export_format not in ("ndjson", "csv"):
+            return Response({"error": "export_format must be 'ndjson' or 'csv'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user_institution = request.user.profile.institution
+        except Profile.DoesNotExist:
+            return Response(
+                {"error": "Logged-in user does not have a profile."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        auditlogs, archived_source, error = self.filter_auditlogs(request, user_institution)
+        if error:
+            return error
+
+        rows = self.iter_export_rows(auditlogs, archived_source)
+        timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
+        if export_format == "csv":
+            response = StreamingHttpResponse(self.stream_csv(rows), content_type="text/csv")
+            response["Content-Disposition"] = f'attachment; filename="auditlogs-{timestamp}.csv"'
+        else:
+            response = StreamingHttpResponse(self.stream_ndjson(rows), content_type="application/x-ndjson")
+            response["Content-Disposition"] = f'attachment; filename="auditlogs-{timestamp}.ndjson"'
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def iter_export_rows(self, auditlogs, archived_source):
+        # Oldest first: archived months stream in file order, then the hot rows which are all newer
+        if archived_source is not None:
+            yield from self.iter_archived_export_rows(archived_source(newest_first=False))
+
+        hot_rows = auditlogs.order_by("timestamp", "id").values(*self.export_fields)
+        yield from hot_rows.iterator(chunk_size=self.chunk_size)
+
+    def iter_archived_export_rows(self, archived_rows):
+        content_type_models = {}
+        user_names = {}
+        while True:
+            chunk = list(islice(archived_rows, self.chunk_size))
+            if not chunk:
+                return
+            missing_user_ids = {row["user_id"] for row in chunk if row["user_id"] is not None} - user_names.keys()
+            if missing_user_ids:
+                users = User.objects.only("id", "fullname").in_bulk(missing_user_ids)
+                for user_id in missing_user_ids:
+                    user = users.get(user_id)
+                    user_names[user_id] = user.fullname if user else None
+            for row in chunk:
+                ct_id = row["content_type_id"]
+                if ct_id not in content_type_models:
+                    content_type = ContentType.objects.get_for_id(ct_id)
+                    content_type_models[ct_id] = content_type.model
+                yield {
+                    **{field: row.get(field) for field in self.export_fields if "__" not in field},
+                    "content_type__model": content_type_models[ct_id],
+                    "user__fullname": user_names.get(row["user_id"]),
+                }
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+    def stream_csv(self, rows):
+        buffer = _Echo()
+        writer = csv.writer(buffer)
+        yield writer.writerow(self.export_fields)
+        for row in rows:
+            yield writer.writerow([
+                json.dumps(row[field]) if field == "changes" and row[field] is not None else row[field]
+                for field in self.export_fields
+            ])
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+class AuditTrackerMetricsApiView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        description="Size of the in-memory audit state held by the worker serving this request.",
+        summary="Get audit tracker metrics",
+        tags=["Audit Log Management"],
+    )
+    def get(self, request):
+        return Response(get_tracker_metrics(), status=status.HTTP_200_OK)
@@ -0,0 +1,4 @@
+from audit.registry import audit_registry
+
+# Occurrences are generated in bulk from their Event, which is audited itself
+audit_registry.skip("calendar2.EventOccurrence")
@@ -54,7 +54,7 @@ class PublicHolidayListCreateView(APIView):
             )
         paginator = CustomPageNumberPagination()
         paginated_holidays = paginator.paginate_queryset(public_holidays, request)
-        serializer = PublicHolidaySerializer(paginated_holidays, many=True)
+        serializer = PublicHolidaySerializer(paginated_holidays, many=True, context={"request": request})
 
         return paginator.get_paginated_response(serializer.data)
 
@@ -198,7 +198,7 @@ class EventListCreateView(APIView):
             )
         paginator = CustomPageNumberPagination()
         paginated_events = paginator.paginate_queryset(events, request)
-        serializer = EventSerializer(paginated_events, many=True)
+        serializer = EventSerializer(paginated_events, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
@@ -0,0 +1,168 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from communication.models import ArchivedNotification
+from communication.views import NOTIFICATION_OVERFLOW_KEY, get_read_flags, get_unread_key, redis_client
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 500
+
+
+def get_notification_time(notification):
+    """
+    Creation time of a notification. Older notifications have no created_at,
+    their id is the millisecond timestamp of their creation.
+    """
+    if notification.get('created_at'):
+        try:
+            return parse_datetime(notification['created_at'])
+        except (TypeError, ValueError):
+            return None
+    try:
+        return datetime.fromtimestamp(int(notification['id']) / 1000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def build_archived_notifications(user_id, notifications, read_flags):
+    rows = []
+    for notification, is_read in zip(notifications, read_flags):
+        rows.append(ArchivedNotification(
+            user_id=user_id,
+            notification_id=notification['id'],
+            message=notification.get('message') or '',
+            model_name=notification.get('model_name'),
+            object_id=str(notification['object_id']) if notification.get('object_id') is not None else None,
+            is_read=is_read,
+            created_at=get_notification_time(notification) or timezone.now(),
+        ))
+    return rows
+
+
+def parse_notifications(raw_items):
+    notifications = []
+    for item in raw_items:
+        try:
+            notification = json.loads(item)
+            notification['id'] = str(notification['id'])
+            notifications.append(notification)
+        except (json.JSONDecodeError, KeyError, TypeError):
+            notifications.append(None)
+    return notifications
+
+
+def get_existing_user_ids(user_ids) -> set:
+    from django.contrib.auth import get_user_model
+
+    return set(get_user_model().objects.filter(id__in=list(user_ids)).values_list('id', flat=True))
+
+
+def archive_user_queue(user_id, cutoff, user_exists=True) -> int:
+    """
+    Move the notifications of one queue created before cutoff to the
+    database, oldest first. The queue head is trimmed in a WATCHed
+    transaction, so a push or cap overflow in between only causes a retry;
+    rows already written are skipped on the retry. Notifications of
+    deleted users are dropped instead.
+    """
+    key = f"notifications:{user_id}"
+    read_key = f"read_notifications:{user_id}"
+    archived = 0
+    while True:
+        with redis_client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                notifications = parse_notifications(pipe.lrange(key, 0, ARCHIVE_BATCH_SIZE - 1))
+                # Queues are in push order, the old notifications form the head
+                old_count = 0
+                for notification in notifications:
+                    if notification is not None:
+                        created_at = get_notification_time(notification)
+                        if created_at is None or created_at >= cutoff:
+                            break
+                    old_count += 1
+                if not old_count:
+                    pipe.reset()
+                    return archived
+
+                old = [notification for notification in notifications[:old_count] if notification is not None]
+                ids = [notification['id'] for notification in old]
+                if user_exists:
+                    ArchivedNotification.objects.bulk_create(
+                        build_archived_notifications(user_id, old, get_read_flags(user_id, ids)),
+                        ignore_conflicts=True,
+                    )
+
+                pipe.multi()
+                pipe.ltrim(key, old_count, -1)
+                if ids:
+                    pipe.srem(get_unread_key(user_id), *ids)
+                    pipe.srem(read_key, *ids)
+                pipe.execute()
+                archived += len(old)
+            except redis.WatchError:
+                continue
+        if old_count < ARCHIVE_BATCH_SIZE:
+            return archived
+
+
+def archive_overflow() -> int:
+    """Move the notifications pushed out by the queue length cap to the database."""
+    archived = 0
+    while True:
+        raw_items = redis_client.lrange(NOTIFICATION_OVERFLOW_KEY, 0, ARCHIVE_BATCH_SIZE - 1)
+        if not raw_items:
+            return archived
+
+        by_user = {}
+        for raw_item in raw_items:
+            user_id, _, payload = raw_item.partition('|')
+            notification = parse_notifications([payload])[0]
+            if user_id.isdigit() and notification is not None:
+                by_user.setdefault(int(user_id), []).append(notification)
+
+        rows = []
+        existing_users = get_existing_user_ids(by_user)
+        for user_id, notifications in by_user.items():
+            if user_id not in existing_users:
+                continue
+            ids = [notification['id'] for notification in notifications]
+            rows.extend(build_archived_notifications(user_id, notifications, get_read_flags(user_id, ids)))
+        ArchivedNotification.objects.bulk_create(rows, ignore_conflicts=True)
+
+        # Only this job consumes the overflow list, producers append at the tail
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.ltrim(NOTIFICATION_OVERFLOW_KEY, len(raw_items), -1)
+        for user_id, notifications in by_user.items():
+            pipe.srem(f"read_notifications:{user_id}", *[notification['id'] for notification in notifications])
+        pipe.execute()
+        archived += len(rows)
+
+
+def archive_old_notifications(days=None) -> int:
+    """
+    Move notifications older than NOTIFICATION_RETENTION_DAYS (or days) and
+    those pushed out by the queue cap from Redis to ArchivedNotification.
+    Returns the number of notifications archived.
+    """
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+
+    archived = archive_overflow()
+    user_ids = {
+        int(key.split(':', 1)[1])
+        for key in redis_client.scan_iter(match='notifications:*', count=1000)
+        if key.split(':', 1)[1].isdigit()
+    }
+    existing_users = get_existing_user_ids(user_ids)
+    for user_id in user_ids:
+        archived += archive_user_queue(user_id, cutoff, user_exists=user_id in existing_users)
+    logger.info("Archived %s notification(s) older than %s", archived, cutoff)
+    return archived
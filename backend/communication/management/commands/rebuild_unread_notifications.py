@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from communication.views import rebuild_unread_notifications, redis_client
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the unread notification sets from the notification queues and read sets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='Only rebuild this user id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['users']
+        if not user_ids:
+            user_ids = [
+                key.split(':', 1)[1]
+                for key in redis_client.scan_iter(match='notifications:*', count=1000)
+                if key.split(':', 1)[1].isdigit()
+            ]
+        self.stdout.write(f"Rebuilding unread notifications of {len(user_ids)} user(s)...")
+
+        unread = 0
+        for user_id in user_ids:
+            unread += rebuild_unread_notifications(user_id)
+
+        self.stdout.write(self.style.SUCCESS(f'{unread} unread notification(s) indexed.'))
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import resource
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from communication.views import get_notification_channel, get_notification_hub, notification_event_stream
+
+
+def get_rss_mb():
+    """Current resident memory of this process, peak memory where /proc is unavailable."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Opens concurrent notification SSE streams in this process against the configured Redis, '
+        'publishes test notifications and reports memory, threads, Redis connections and delivery latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--streams',
+            type=int,
+            action='append',
+            dest='streams',
+            help='Number of concurrent streams (can be repeated, default 1000 and 5000)',
+        )
+        parser.add_argument('--users', type=int, default=500, help='Distinct users the streams are spread over')
+        parser.add_argument('--notifications', type=int, default=200, help='Notifications published per run')
+        parser.add_argument(
+            '--user-offset',
+            type=int,
+            default=10_000_000,
+            help='First user id used for the benchmark channels, keep it clear of real users',
+        )
+        parser.add_argument('--timeout', type=float, default=30.0, help='Seconds to wait for the deliveries')
+
+    def handle(self, *args, **options):
+        levels = options['streams'] or [1000, 5000]
+        self.stdout.write(f"{'streams':>8} {'rss MB':>8} {'+rss MB':>8} {'threads':>8} {'redis conns':>12} "
+                          f"{'delivered':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for streams in levels:
+            result = asyncio.run(self.run_level(streams, options))
+            self.stdout.write(
+                f"{streams:>8} {result['rss']:>8.1f} {result['rss_delta']:>8.1f} {result['threads']:>8} "
+                f"{result['connections']:>12} {result['delivered']:>4}/{result['expected']:<5} "
+                f"{result['p50']:>8.1f} {result['p95']:>8.1f} {result['max']:>8.1f}"
+            )
+
+    async def run_level(self, stream_count, options):
+        users = max(1, min(options['users'], stream_count))
+        user_ids = [options['user_offset'] + index for index in range(users)]
+        rss_before = get_rss_mb()
+
+        # Open every stream and wait for its connection event
+        streams = [notification_event_stream(user_ids[index % users]) for index in range(stream_count)]
+        await asyncio.gather(*(stream.__anext__() for stream in streams))
+
+        streams_per_user = [stream_count // users + (1 if index < stream_count % users else 0) for index in range(users)]
+        expected = sum(streams_per_user[index % users] for index in range(options['notifications']))
+        latencies = []
+        done = asyncio.Event()
+
+        async def consume(stream):
+            async for event in stream:
+                data = json.loads(event[len('data: '):])
+                if 'bench_sent_at' in data:
+                    latencies.append((time.perf_counter() - data['bench_sent_at']) * 1000)
+                    if len(latencies) >= expected:
+                        done.set()
+
+        consumers = [asyncio.create_task(consume(stream)) for stream in streams]
+
+        # Published only, the benchmark never writes to real notification queues
+        hub = get_notification_hub()
+        for index in range(options['notifications']):
+            user_index = index % users
+            await hub.client.publish(
+                get_notification_channel(user_ids[user_index]),
+                json.dumps({'id': str(index), 'message': 'benchmark', 'bench_sent_at': time.perf_counter()}),
+            )
+        try:
+            await asyncio.wait_for(done.wait(), timeout=options['timeout'])
+        except asyncio.TimeoutError:
+            pass
+
+        rss_after = get_rss_mb()
+        result = {
+            'rss': rss_after,
+            'rss_delta': rss_after - rss_before,
+            'threads': threading.active_count(),
+            'connections': len(getattr(hub.pool, '_connections', ())),
+            'delivered': len(latencies),
+            'expected': expected,
+            'p50': statistics.median(latencies) if latencies else 0.0,
+            'p95': statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0,
+            'max': max(latencies, default=0.0),
+        }
+
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        for stream in streams:
+            await stream.aclose()
+        await hub.close()
+        return result
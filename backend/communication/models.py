@@ -1,3 +1,26 @@
 from django.db import models
 
-# Create your models here.
+
+class ArchivedNotification(models.Model):
+    """
+    A notification moved out of the user's Redis queue once older than
+    NOTIFICATION_RETENTION_DAYS, or pushed out by the queue length cap.
+    Served by the notification history endpoint.
+    """
+    user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_id = models.CharField(max_length=32)
+    message = models.TextField()
+    model_name = models.CharField(max_length=100, null=True, blank=True)
+    object_id = models.CharField(max_length=64, null=True, blank=True)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'notification_id')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='archived_notif_user_age_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification {self.notification_id} for user {self.user_id}"
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+
+@shared_task
+def archive_old_notifications(days=None):
+    """
+    Celery beat task that moves notifications older than
+    NOTIFICATION_RETENTION_DAYS from Redis to the database.
+    """
+    from communication.archive import archive_old_notifications as archive
+
+    return archive(days)
@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import sse_notifications, MarkNotificationRead, GetAllNotifications
+from .views import sse_notifications, MarkNotificationRead, GetAllNotifications, NotificationHistory
 
 urlpatterns = [
     path('notifications/sse/', sse_notifications, name='sse_notifications'),
     path('notifications/read/', MarkNotificationRead.as_view(), name='mark_notification_read'),
     path('all-notifications/', GetAllNotifications.as_view(), name='all-notifications'),
+    path('notifications/history/', NotificationHistory.as_view(), name='notification-history'),
     
 ]
\ No newline at end of file
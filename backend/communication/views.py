@@ -6,103 +6,290 @@ from rest_framework import status
 import json
 import asyncio
 import redis
+import redis.asyncio as aioredis
 import time
+import uuid
 import logging
 from asgiref.sync import sync_to_async
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.conf import settings
+from django.utils import timezone
 from typing import Optional
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 
-from utilities.pagination import CustomPageNumberPagination
+from utilities.pagination import CustomPageNumberPagination, KeysetPagination
+from communication.models import ArchivedNotification
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Initialize Redis client
 try:
-    redis_client: redis.Redis = redis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        decode_responses=True
-    )
+    # Same REDIS_URL as the SSE pool, so streams read what the writers push
+    redis_client: redis.Redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
     redis_client.ping()
     logger.info("✅ Successfully connected to Redis")
 except redis.ConnectionError as e:
     logger.error(f"❌ Failed to connect to Redis: {str(e)}")
     raise
 
-def add_notification(user_id: int, message: str, model_name: str = None, object_id: str = None) -> None:
-    """Add a notification to the user's Redis queue with optional model and object ID."""
-    notification = {
-        'id': str(int(time.time() * 1000)),  # Store ID as string
+# Notifications waiting for a slow SSE client before newer ones are dropped
+SSE_STREAM_QUEUE_SIZE = 100
+
+# Event loop -> NotificationHub, one per loop (a single one under ASGI)
+_notification_hubs = {}
+
+
+class NotificationHub:
+    """
+    Fans the notification pub/sub channels out to the SSE streams of this
+    event loop. All streams share one subscriber connection and a bounded
+    redis.asyncio pool built from REDIS_URL; pooled connections authenticate
+    once when opened and are reused, and no stream ever needs a thread. The
+    reader task runs only while at least one stream is subscribed.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.pool = aioredis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.NOTIFICATION_SSE_REDIS_MAX_CONNECTIONS,
+            timeout=settings.NOTIFICATION_SSE_REDIS_POOL_TIMEOUT,
+            decode_responses=True,
+        )
+        self.client = aioredis.Redis(connection_pool=self.pool)
+        self.pubsub = self.client.pubsub()
+        self.listeners = {}
+        self.lock = asyncio.Lock()
+        self.reader = None
+
+    async def subscribe(self, channel: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SSE_STREAM_QUEUE_SIZE)
+        async with self.lock:
+            listeners = self.listeners.setdefault(channel, set())
+            if not listeners:
+                await self.pubsub.subscribe(channel)
+            listeners.add(queue)
+            if self.reader is None or self.reader.done():
+                self.reader = asyncio.create_task(self.read())
+        return queue
+
+    async def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        async with self.lock:
+            listeners = self.listeners.get(channel)
+            if listeners is None:
+                return
+            listeners.discard(queue)
+            if not listeners:
+                del self.listeners[channel]
+                await self.pubsub.unsubscribe(channel)
+            if not self.listeners and self.reader is not None:
+                # Nothing left to read, the next subscribe starts a new reader
+                self.reader.cancel()
+                self.reader = None
+
+    async def read(self) -> None:
+        while True:
+            try:
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except redis.RedisError as e:
+                # The next read reconnects and subscribes to the channels again
+                logger.warning(f"Notification pub/sub read failed: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message['type'] != 'message':
+                continue
+            for queue in list(self.listeners.get(message['channel'], ())):
+                try:
+                    queue.put_nowait(message['data'])
+                except asyncio.QueueFull:
+                    pass
+
+    async def close(self) -> None:
+        if self.reader is not None:
+            self.reader.cancel()
+        await self.pubsub.aclose()
+        await self.pool.disconnect()
+
+
+def get_notification_hub() -> NotificationHub:
+    loop = asyncio.get_running_loop()
+    hub = _notification_hubs.get(id(loop))
+    if hub is None or hub.loop is not loop:
+        # Forget hubs of loops that are gone (runserver runs each async view in a new loop)
+        for key, stale in list(_notification_hubs.items()):
+            if stale.loop.is_closed():
+                del _notification_hubs[key]
+        hub = _notification_hubs[id(loop)] = NotificationHub(loop)
+    return hub
+
+
+async def notification_event_stream(user_id: int):
+    """SSE events of one user: notifications as they are published, heartbeats on a fixed schedule."""
+    hub = get_notification_hub()
+    channel = get_notification_channel(user_id)
+    queue = await hub.subscribe(channel)
+    try:
+        # Subscribed before counting, a notification arriving in between is not lost
+        unread_count = await hub.client.scard(get_unread_key(user_id))
+        yield f'data: {{"message": "SSE connection established", "unread_count": {unread_count}}}\n\n'
+        heartbeat_interval = settings.NOTIFICATION_SSE_HEARTBEAT_SECONDS
+        next_heartbeat = time.monotonic() + heartbeat_interval
+
+        while True:
+            # Wait for a notification until the next heartbeat is due
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=max(next_heartbeat - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                payload = None
+            if payload is not None:
+                try:
+                    notif = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+                unread_count = await hub.client.scard(get_unread_key(user_id))
+                notif['unread_count'] = unread_count
+                yield f"data: {json.dumps(notif)}\n\n"
+
+            if time.monotonic() >= next_heartbeat:
+                yield f'data: {{"unread_count": {unread_count}}}\n\n'
+                next_heartbeat = time.monotonic() + heartbeat_interval
+    finally:
+        await hub.unsubscribe(channel, queue)
+
+# Notifications pushed out of a queue by NOTIFICATION_QUEUE_MAX_LENGTH, as "<user_id>|<payload>", until archived
+NOTIFICATION_OVERFLOW_KEY = "notifications:overflow"
+
+# Append a notification and mark it unread; entries beyond the cap are popped
+# from the head, dropped from the unread set and handed over for archival.
+_push_notification_script = redis_client.register_script("""
+redis.call('RPUSH', KEYS[1], ARGV[1])
+redis.call('SADD', KEYS[2], ARGV[2])
+local cap = tonumber(ARGV[3])
+local overflow = redis.call('LLEN', KEYS[1]) - cap
+if cap > 0 and overflow > 0 then
+    for _, item in ipairs(redis.call('LPOP', KEYS[1], overflow)) do
+        local ok, data = pcall(cjson.decode, item)
+        if ok and data['id'] then
+            redis.call('SREM', KEYS[2], tostring(data['id']))
+        end
+        redis.call('RPUSH', KEYS[3], ARGV[4] .. '|' .. item)
+    end
+end
+""")
+
+def get_unread_key(user_id: int) -> str:
+    """Set of the ids of a user's unread notifications; its SCARD is the unread count."""
+    return f"unread_notifications:{user_id}"
+
+def get_notification_channel(user_id: int) -> str:
+    """Pub/sub channel new notifications of a user are published on for open SSE streams."""
+    return f"notifications:channel:{user_id}"
+
+def queue_notification(pipe, user_id: int, notification_id: str, payload: str) -> None:
+    """Queue, mark unread and publish one notification on a pipeline."""
+    _push_notification_script(
+        keys=[f"notifications:{user_id}", get_unread_key(user_id), NOTIFICATION_OVERFLOW_KEY],
+        args=[payload, notification_id, settings.NOTIFICATION_QUEUE_MAX_LENGTH, user_id],
+        client=pipe,
+    )
+    pipe.publish(get_notification_channel(user_id), payload)
+
+def mark_read(pipe, user_id: int, notification_id: str) -> None:
+    """Move a notification from the unread set to the read set on a pipeline; the read set expires when idle."""
+    read_notifications_key = f"read_notifications:{user_id}"
+    pipe.sadd(read_notifications_key, str(notification_id))
+    pipe.expire(read_notifications_key, settings.NOTIFICATION_READ_STATE_TTL_DAYS * 24 * 60 * 60)
+    pipe.srem(get_unread_key(user_id), str(notification_id))
+
+def build_notification(message: str, model_name: str = None, object_id: str = None) -> dict:
+    """
+    Payload of a new notification. Ids are random rather than time based so
+    notifications created in the same millisecond never share one; the
+    creation time is stored alongside for retention and history.
+    """
+    return {
+        'id': uuid.uuid4().hex,
         'message': message,
         'model_name': model_name,
-        'object_id': object_id
+        'object_id': object_id,
+        'created_at': timezone.now().isoformat(),
     }
+
+def add_notification(user_id: int, message: str, model_name: str = None, object_id: str = None) -> None:
+    """Add a notification to the user's Redis queue with optional model and object ID."""
+    notification = build_notification(message, model_name, object_id)
+    payload = json.dumps(notification)
     try:
-        redis_client.rpush(f"notifications:{user_id}", json.dumps(notification))
-        queue_length = redis_client.llen(f"notifications:{user_id}")
+        pipe = redis_client.pipeline(transaction=False)
+        queue_notification(pipe, user_id, notification['id'], payload)
+        pipe.execute()
     except redis.RedisError as e:
         raise
 
-def get_notification(user_id: int) -> Optional[dict]:
-    """Retrieve the oldest unread notification for the user."""
-    lock_key = f"lock:notifications:{user_id}"
-    with redis_client.lock(lock_key, timeout=50):
-        try:
-            notifications = redis_client.lrange(f"notifications:{user_id}", 0, -1)
-            queue_length = len(notifications)
-            
-            read_notifications_key = f"read_notifications:{user_id}"
-            read_notifications = redis_client.smembers(read_notifications_key)
-            for notification in notifications:
-                try:
-                    notification_data = json.loads(notification)
-                    notification_id = str(notification_data['id'])
-                    if not redis_client.sismember(read_notifications_key, notification_id):
-                        return notification_data
-                except (json.JSONDecodeError, KeyError) as e:
-                    continue
-            return None
-        except redis.RedisError as e:
-            return None
+def add_notifications(user_ids, message: str, model_name: str = None, object_id: str = None) -> None:
+    """Add the same notification to several users' queues in a single Redis round-trip."""
+    notification = build_notification(message, model_name, object_id)
+    payload = json.dumps(notification)
+    pipe = redis_client.pipeline(transaction=False)
+    for user_id in user_ids:
+        queue_notification(pipe, user_id, notification['id'], payload)
+    pipe.execute()
+
+def push_notifications(notifications) -> None:
+    """
+    Add different notifications to different users in a single Redis round-trip.
+    notifications: iterable of (user_id, message, model_name, object_id).
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    for user_id, message, model_name, object_id in notifications:
+        notification = build_notification(message, model_name, object_id)
+        queue_notification(pipe, user_id, notification['id'], json.dumps(notification))
+    pipe.execute()
+
+def get_read_flags(user_id: int, notification_ids) -> list:
+    """Read state of each of the given notification ids, in one SMISMEMBER."""
+    notification_ids = list(notification_ids)
+    if not notification_ids:
+        return []
+    return [bool(flag) for flag in redis_client.smismember(f"read_notifications:{user_id}", notification_ids)]
 
 def get_unread_count(user_id: int) -> int:
     """Get the count of unread notifications for the user."""
-    lock_key = f"lock:notifications:{user_id}"
-    with redis_client.lock(lock_key, timeout=5):
-        try:
-            notifications = redis_client.lrange(f"notifications:{user_id}", 0, -1)
-            read_notifications_key = f"read_notifications:{user_id}"
-            read_notifications = redis_client.smembers(read_notifications_key)
-            unread_count = 0
-            for notification in notifications:
-                try:
-                    notification_data = json.loads(notification)
-                    notification_id = str(notification_data['id'])
-                    if not redis_client.sismember(read_notifications_key, notification_id):
-                        unread_count += 1
-                except (json.JSONDecodeError, KeyError) as e:
-                    continue
-            return unread_count
-        except redis.RedisError as e:
-            return 0
+    try:
+        return redis_client.scard(get_unread_key(user_id))
+    except redis.RedisError as e:
+        return 0
 
 def mark_notification_read(user_id: int, notification_id: str) -> None:
     """Mark a notification as read for the user."""
     try:
-        read_notifications_key = f"read_notifications:{user_id}"
-        redis_client.sadd(read_notifications_key, str(notification_id))
+        pipe = redis_client.pipeline(transaction=False)
+        mark_read(pipe, user_id, notification_id)
+        pipe.execute()
     except redis.RedisError as e:
         pass
 
+def rebuild_unread_notifications(user_id: int) -> int:
+    """Recompute a user's unread set from the queue and the read set. Returns the unread count."""
+    ids = []
+    for notification in redis_client.lrange(f"notifications:{user_id}", 0, -1):
+        try:
+            ids.append(str(json.loads(notification)['id']))
+        except (json.JSONDecodeError, KeyError) as e:
+            continue
+    unread_ids = [notification_id for notification_id, is_read in zip(ids, get_read_flags(user_id, ids)) if not is_read]
+    pipe = redis_client.pipeline()
+    pipe.delete(get_unread_key(user_id))
+    if unread_ids:
+        pipe.sadd(get_unread_key(user_id), *unread_ids)
+    pipe.execute()
+    return len(unread_ids)
+
 def cleanup_queue(user_id: int) -> None:
     """Delete the user's notification queue and read notifications in Redis."""
     try:
-        redis_client.delete(f"notifications:{user_id}")
-        redis_client.delete(f"read_notifications:{user_id}")
+        redis_client.delete(f"notifications:{user_id}", f"read_notifications:{user_id}", get_unread_key(user_id))
     except redis.RedisError as e:
         pass
 
@@ -130,29 +317,10 @@ async def sse_notifications(request):
             return HttpResponse("Unauthorized", status=401)
 
         user, _ = user_auth_tuple
-        user_id = await sync_to_async(lambda: user.id)()
-
-        async def event_stream():
-            yield "data: {\"message\": \"SSE connection established\", \"unread_count\": 0}\n\n"
-            last_heartbeat = time.time()
-
-            while True:
-                notif = await sync_to_async(lambda: get_notification(user_id))()
-                unread_count = await sync_to_async(lambda: get_unread_count(user_id))()
-                if notif:
-                    notif['unread_count'] = unread_count
-                    yield f"data: {json.dumps(notif)}\n\n"
-                    # Removed: await sync_to_async(lambda: mark_notification_read(user_id, notif['id']))()
-                
-                current_time = time.time()
-                if current_time - last_heartbeat > 10:
-                    yield f'data: {{"unread_count": {unread_count}}}\n\n'
-                    last_heartbeat = current_time
-
-                await asyncio.sleep(500)
+        user_id = user.id
 
         response = StreamingHttpResponse(
-            event_stream(),
+            notification_event_stream(user_id),
             content_type='text/event-stream'
         )
         response['Cache-Control'] = 'no-cache'
@@ -202,9 +370,10 @@ class MarkNotificationRead(APIView):
             if not notification_id:
                 return Response({"error": "notification_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            read_notifications_key = f"read_notifications:{user_id}"
             try:
-                redis_client.sadd(read_notifications_key, str(notification_id))
+                pipe = redis_client.pipeline(transaction=False)
+                mark_read(pipe, user_id, notification_id)
+                pipe.execute()
                 return Response({"message": f"Notification {notification_id} marked as read"}, status=status.HTTP_200_OK)
             except redis.RedisError as e:
                 return Response({"error": "Failed to mark notification as read"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -212,6 +381,47 @@ class MarkNotificationRead(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class NotificationQueue:
+    """
+    A user's notification queue as a lazy sequence for Django's Paginator:
+    the count is an LLEN and a page is one LRANGE plus one SMISMEMBER for
+    its read flags, so a request costs the page size, not the queue length.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.key = f"notifications:{user_id}"
+
+    def count(self) -> int:
+        return redis_client.llen(self.key)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            page = self[index:index + 1]
+            if not page:
+                raise IndexError(index)
+            return page[0]
+        start = index.start or 0
+        if index.stop is not None and index.stop <= start:
+            return []
+        # LRANGE bounds are inclusive
+        stop = index.stop - 1 if index.stop is not None else -1
+        notifications = []
+        for notification in redis_client.lrange(self.key, start, stop):
+            try:
+                notification_data = json.loads(notification)
+                notification_data['id'] = str(notification_data['id'])
+                notifications.append(notification_data)
+            except (json.JSONDecodeError, KeyError) as e:
+                continue
+        read_flags = get_read_flags(self.user_id, [notification['id'] for notification in notifications])
+        for notification_data, is_read in zip(notifications, read_flags):
+            notification_data['is_read'] = is_read
+        return notifications
+
 class GetAllNotifications(APIView):
     """Endpoint to fetch all notifications (read and unread) for the user with pagination."""
     authentication_classes = [JWTAuthentication]
@@ -257,20 +467,7 @@ class GetAllNotifications(APIView):
 
             user_id = user.id
             try:
-                notifications = redis_client.lrange(f"notifications:{user_id}", 0, -1)
-                read_notifications_key = f"read_notifications:{user_id}"
-                notifications_list = []
-
-                for notification in notifications:
-                    try:
-                        notification_data = json.loads(notification)
-                        notification_id = str(notification_data['id'])
-                        is_read = redis_client.sismember(read_notifications_key, notification_id)
-                        notification_data['is_read'] = is_read
-                        notifications_list.append(notification_data)
-                    except (json.JSONDecodeError, KeyError) as e:
-                        continue
-
+                notifications_list = NotificationQueue(user_id)
                 paginator = self.pagination_class()
                 paginated_notifications = paginator.paginate_queryset(notifications_list, request)
                 return paginator.get_paginated_response({"notifications": paginated_notifications})
@@ -280,3 +477,52 @@ class GetAllNotifications(APIView):
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class NotificationHistory(APIView):
+    """Endpoint to browse notifications archived out of Redis."""
+    authentication_classes = [JWTAuthentication]
+
+    @extend_schema(
+        summary="Get Notification History",
+        description="Notifications older than the retention period, moved from the live queue to the database. Newest first, cursor paginated: follow the `next`/`previous` links. Use 'page_size' to control the page length.",
+        responses={
+            200: OpenApiResponse(description="Cursor paginated list of archived notifications", examples={
+                "application/json": {
+                    "next": "http://api.example.com/notifications/history/?cursor=...",
+                    "previous": None,
+                    "results": [
+                        {
+                            "id": "123456789",
+                            "message": "Test notification",
+                            "model_name": "approvergroup",
+                            "object_id": "1",
+                            "is_read": True,
+                            "created_at": "2025-01-01T10:00:00Z"
+                        }
+                    ]
+                }
+            }),
+            401: OpenApiResponse(description="Unauthorized - Invalid or missing JWT token"),
+        },
+        auth=["BearerAuth"]
+    )
+    def get(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        notifications = ArchivedNotification.objects.filter(user=user)
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(notifications, request)
+        return paginator.get_paginated_response([
+            {
+                "id": notification.notification_id,
+                "message": notification.message,
+                "model_name": notification.model_name,
+                "object_id": notification.object_id,
+                "is_read": notification.is_read,
+                "created_at": notification.created_at,
+            }
+            for notification in page
+        ])
@@ -6,6 +6,7 @@ import dj_database_url
 from corsheaders.defaults import default_headers
 from urllib.parse import urlparse
 import base64
+from celery.schedules import crontab
 
 load_dotenv()
 
@@ -229,9 +230,28 @@ CHANNEL_LAYERS = {
     },
 }
 
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-REDIS_DB = int(os.getenv("REDIS_DB", 0))
+# Derived from REDIS_URL so every Redis client of the app talks to the same server and db
+REDIS_HOST = parsed_redis_url.hostname or "localhost"
+REDIS_PORT = parsed_redis_url.port or 6379
+REDIS_DB = int(parsed_redis_url.path.lstrip("/") or 0)
+NOTIFICATION_SSE_HEARTBEAT_SECONDS = int(os.getenv("NOTIFICATION_SSE_HEARTBEAT_SECONDS", 10))
+# Shared redis.asyncio pool of the SSE streams, per worker process
+NOTIFICATION_SSE_REDIS_MAX_CONNECTIONS = int(os.getenv("NOTIFICATION_SSE_REDIS_MAX_CONNECTIONS", 20))
+NOTIFICATION_SSE_REDIS_POOL_TIMEOUT = int(os.getenv("NOTIFICATION_SSE_REDIS_POOL_TIMEOUT", 5))
+# Notification retention: queue length cap (0 disables it), days kept in Redis before
+# archival, and idle lifetime of read sets (keep it longer than the retention)
+NOTIFICATION_QUEUE_MAX_LENGTH = int(os.getenv("NOTIFICATION_QUEUE_MAX_LENGTH", 1000))
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 30))
+NOTIFICATION_READ_STATE_TTL_DAYS = int(os.getenv("NOTIFICATION_READ_STATE_TTL_DAYS", 90))
+
+# Shared cache, so every process sees the same cached data and invalidations
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "taskmgmt",
+    },
+}
 
 # Celery Configuration Options
 CELERY_TIMEZONE = "Africa/Kampala"
@@ -240,6 +260,33 @@ CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_BROKER_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# Audit log settings
+AUDIT_BATCH_MAX_SIZE = int(os.getenv("AUDIT_BATCH_MAX_SIZE", 500))
+AUDIT_ASYNC_WRITES = os.getenv("AUDIT_ASYNC_WRITES", "False").lower() == "true"
+AUDIT_HOT_MONTHS = int(os.getenv("AUDIT_HOT_MONTHS", 6))
+AUDIT_ARCHIVE_ROOT = os.getenv("AUDIT_ARCHIVE_ROOT", os.path.join(BASE_DIR, "audit_archive"))
+
+# Approval settings
+APPROVAL_ROUTING_CACHE_TIMEOUT = int(os.getenv("APPROVAL_ROUTING_CACHE_TIMEOUT", 24 * 60 * 60))
+APPROVAL_DASHBOARD_CACHE_TIMEOUT = int(os.getenv("APPROVAL_DASHBOARD_CACHE_TIMEOUT", 45))
+APPROVAL_REMINDER_INTERVAL_HOURS = int(os.getenv("APPROVAL_REMINDER_INTERVAL_HOURS", 24))
+
+CELERY_BEAT_SCHEDULE = {
+    "archive-audit-logs": {
+        "task": "audit.tasks.archive_old_audit_logs",
+        "schedule": crontab(minute=0, hour=2, day_of_month=1),
+    },
+    "archive-notifications": {
+        "task": "communication.tasks.archive_old_notifications",
+        "schedule": crontab(minute=30, hour=2),
+    },
+    # Safe to run often, each approver is reminded once per task per interval
+    "approval-overdue-reminders": {
+        "task": "approval.tasks.send_overdue_approval_reminders",
+        "schedule": crontab(minute=0),
+    },
+}
+
 # spotcheck settings
 SPOTCHECK_DEFAULT_MINUTES_TO_EXPIRE = int(
     os.getenv("SPOTCHECK_DEFAULT_MINUTES_TO_EXPIRE", 5)
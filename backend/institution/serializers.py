@@ -181,7 +181,7 @@ class InstitutionSerializer(serializers.ModelSerializer):
                 "branch_id", flat=True
             )
             branches = institution.branches.filter(id__in=user_branches)
-        return BranchSerializer(branches, many=True).data
+        return BranchSerializer(branches, many=True, context=self.context).data
 
 
 class InstitutionBankTypeSerializer(BaseApprovableSerializer):
@@ -265,7 +265,7 @@ class InstitutionBankAccountSerializer(BaseApprovableSerializer):
     def get_paid_branches(self, obj):
         from .serializers import BranchSerializer
 
-        return BranchSerializer(obj.paid_branches.all(), many=True).data
+        return BranchSerializer(obj.paid_branches.all(), many=True, context=self.context).data
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
@@ -469,7 +469,7 @@ class InstitutionWithBranchesSerializer(InstitutionSerializer):
             )
             branches = institution.branches.filter(id__in=user_branches)
 
-        return BranchSerializer(branches, many=True).data
+        return BranchSerializer(branches, many=True, context=self.context).data
 
 
 class UserBranchSerializer(serializers.ModelSerializer):
@@ -670,7 +670,7 @@ class InstitutionBankTypeListAPIView(APIView, SortableAPIMixin):
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(bank_types, request)
 
-        serializer = InstitutionBankTypeSerializer(paginated_qs, many=True)
+        serializer = InstitutionBankTypeSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
@@ -800,7 +800,7 @@ class InstitutionBankAccountListAPIView(APIView, SortableAPIMixin):
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(bank_accounts, request)
 
-        serializer = InstitutionBankAccountSerializer(paginated_qs, many=True)
+        serializer = InstitutionBankAccountSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
@@ -904,7 +904,7 @@ class InstitutionWorkingDaysListAPIView(APIView):
             institution=institution, deleted_at__isnull=True
         )
 
-        serializer = InstitutionWorkingDaysSerializer(working_days, many=True)
+        serializer = InstitutionWorkingDaysSerializer(working_days, many=True, context={"request": request})
 
         return Response(serializer.data)
 
@@ -1030,7 +1030,7 @@ class BranchListAPIView(APIView, SortableAPIMixin):
         paginator = CustomPageNumberPagination()
         paginator_qs = paginator.paginate_queryset(branches, request)
 
-        serializer = BranchSerializer(paginator_qs, many=True)
+        serializer = BranchSerializer(paginator_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -1158,7 +1158,7 @@ class InstitutionBranchAPIView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(branches, request)
-        serializer = BranchSerializer(paginated_qs, many=True)
+        serializer = BranchSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -1396,7 +1396,7 @@ class DepartmentListAPIView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginator_qs = paginator.paginate_queryset(departments, request)
-        serializer = DepartmentSerializer(paginator_qs, many=True)
+        serializer = DepartmentSerializer(paginator_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -0,0 +1,3 @@
+from audit.registry import audit_registry
+
+audit_registry.register_label("projects.TaskTimeSheet", lambda timesheet: f"timesheet of task #{timesheet.task_id}")
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0019_projecttaskemailconfig'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskmessage',
+            index=models.Index(fields=['institution', 'created_at', 'id'], name='taskmsg_inst_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmessage',
+            index=models.Index(fields=['institution', 'created_at', 'id'], name='projmsg_inst_created_idx'),
+        ),
+    ]
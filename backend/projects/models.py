@@ -481,6 +481,7 @@ class TaskMessage(BaseModel, BaseApprovableModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['institution', 'created_at', 'id'], name='taskmsg_inst_created_idx'),
         ]
 
     def get_institution(self):
@@ -510,6 +511,7 @@ class ProjectMessage(BaseModel, BaseApprovableModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['project', 'created_at']),
+            models.Index(fields=['institution', 'created_at', 'id'], name='projmsg_inst_created_idx'),
         ]
     
     def get_institution(self):
@@ -492,7 +492,7 @@ class ProjectSerializer(BaseApprovableSerializer):
 
     def get_project_documents(self, obj):
         documents = obj.documents.filter(deleted_at__isnull=True)
-        return ProjectDocumentSerializer(documents, many=True).data
+        return ProjectDocumentSerializer(documents, many=True, context=self.context).data
 
     def to_internal_value(self, data):
         import json
@@ -810,7 +810,7 @@ class ProjectSerializer(BaseApprovableSerializer):
             rep["failed_status"] = None
 
         # TODO: Remove this nesting and frontend handles the API call
-        rep["project_tasks"] = TaskSerializer(instance.tasks, many=True).data
+        rep["project_tasks"] = TaskSerializer(instance.tasks, many=True, context=self.context).data
 
         return rep
 
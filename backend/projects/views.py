@@ -42,7 +42,7 @@ from rest_framework.views import APIView, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from institution.models import Institution
-from utilities.pagination import CustomPageNumberPagination
+from utilities.pagination import CustomPageNumberPagination, KeysetPagination
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
 from django.db.models import Count, Q
@@ -272,7 +272,7 @@ class TaskListCreateView(APIView, SortableAPIMixin):
         # Pagination
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(tasks, request)
-        serializer = TaskSerializer(paginated_qs, many=True)
+        serializer = TaskSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
@@ -810,7 +810,7 @@ class ProjectStatusListCreateView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(statuses, request)
-        serializer = ProjectStatusSerializer(paginated_qs, many=True)
+        serializer = ProjectStatusSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 class ProjectStatusDetailView(APIView):
@@ -1054,7 +1054,7 @@ class ProjectListCreateView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(projects, request)
-        serializer = ProjectSerializer(paginated_qs, many=True)
+        serializer = ProjectSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -1324,7 +1324,7 @@ class TaskPriorityListCreateView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(priorities, request)
-        serializer = TaskPrioritySerializer(paginated_qs, many=True)
+        serializer = TaskPrioritySerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -1829,9 +1829,9 @@ class TaskMessageListCreateApiView(APIView):
             task_messages = task_messages.filter(task_id=task_id)
 
 
-        paginator = CustomPageNumberPagination()
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
         paginated_qs = paginator.paginate_queryset(task_messages, request)
-        serializer = TaskMessageSerializer(paginated_qs, many=True)
+        serializer = TaskMessageSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -2044,9 +2044,9 @@ class ProjectMessageListCreateApiView(APIView):
             project_messages = project_messages.filter(project_id=project_id)
 
 
-        paginator = CustomPageNumberPagination()
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
         paginated_qs = paginator.paginate_queryset(project_messages, request)
-        serializer = ProjectMessageSerializer(paginated_qs, many=True)
+        serializer = ProjectMessageSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -2639,7 +2639,7 @@ class ProjectTaskStatusListView(APIView):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(project_task_statuses, request)
-        serializer = ProjectTaskStatusSerializer(paginated_qs, many=True)
+        serializer = ProjectTaskStatusSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
@@ -3324,5 +3324,5 @@ class ProjectTaskProgressStatus(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(tasks, request)
-        serializer = TaskSerializer(paginated_qs, many=True)
+        serializer = TaskSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,5 @@
+from audit.registry import audit_registry
+
+audit_registry.register_label(
+    "tasks.StandaloneTaskTimeSheet", lambda timesheet: f"timesheet of standalone task #{timesheet.task_id}"
+)
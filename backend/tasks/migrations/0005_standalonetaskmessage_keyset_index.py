@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_standalonetask_completed_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='standalonetaskmessage',
+            index=models.Index(fields=['institution', 'created_at', 'id'], name='sttaskmsg_inst_created_idx'),
+        ),
+    ]
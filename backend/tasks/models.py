@@ -334,6 +334,7 @@ class StandaloneTaskMessage(BaseModel, BaseApprovableModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['institution', 'created_at', 'id'], name='sttaskmsg_inst_created_idx'),
         ]
 
     def get_institution(self):
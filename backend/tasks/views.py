@@ -25,7 +25,7 @@ from rest_framework.views import APIView, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from institution.models import Institution
-from utilities.pagination import CustomPageNumberPagination
+from utilities.pagination import CustomPageNumberPagination, KeysetPagination
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
 from django.db.models import Q
@@ -234,7 +234,7 @@ class StandaloneTaskListCreateView(APIView, SortableAPIMixin):
         # Pagination
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(tasks, request)
-        serializer = StandaloneTaskSerializer(paginated_qs, many=True)
+        serializer = StandaloneTaskSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
@@ -702,7 +702,7 @@ class StandaloneTaskStatusListCreateView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(statuses, request)
-        serializer = StandaloneTaskStatusSerializer(paginated_qs, many=True)
+        serializer = StandaloneTaskStatusSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -895,7 +895,7 @@ class StandaloneTaskPriorityListCreateView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(priorities, request)
-        serializer = StandaloneTaskPrioritySerializer(paginated_qs, many=True)
+        serializer = StandaloneTaskPrioritySerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -1062,9 +1062,9 @@ class StandaloneTaskMessageListCreateApiView(APIView):
             task_messages = task_messages.filter(task_id=task_id)
 
 
-        paginator = CustomPageNumberPagination()
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
         paginated_qs = paginator.paginate_queryset(task_messages, request)
-        serializer = StandaloneTaskMessageSerializer(paginated_qs, many=True)
+        serializer = StandaloneTaskMessageSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -2005,5 +2005,5 @@ class StandaloneTaskProgressStatus(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(tasks, request)
-        serializer = StandaloneTaskSerializer(paginated_qs, many=True)
+        serializer = StandaloneTaskSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,4 @@
+from audit.registry import audit_registry
+
+# last_login is written on every login; password hashes must never reach the audit trail
+audit_registry.register("users.CustomUser", exclude_fields=("last_login", "password"))
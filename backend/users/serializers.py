@@ -119,7 +119,7 @@ class CustomUserSerializer(serializers.ModelSerializer):
 
     def get_roles(self, obj):
         roles = [ur.role for ur in obj.user_roles.all()]
-        return RoleSerializer(roles, many=True).data
+        return RoleSerializer(roles, many=True, context=self.context).data
 
     def get_branches(self, obj):
         from institution.serializers import BranchSerializer
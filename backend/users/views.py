@@ -1284,7 +1284,7 @@ class StaffGroupListCreateView(APIView, SortableAPIMixin):
 
         paginator = CustomPageNumberPagination()
         paginated_qs = paginator.paginate_queryset(groups, request)
-        serializer = StaffGroupSerializer(paginated_qs, many=True)
+        serializer = StaffGroupSerializer(paginated_qs, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
 
 class StaffGroupDetailView(APIView):
@@ -0,0 +1,93 @@
+from django.contrib.contenttypes.models import ContentType
+from django.urls import NoReverseMatch, reverse
+import threading
+
+# Stand-in primary key used to turn a detail URL into a template once per content type
+_URL_PK_SENTINEL = 987654321987654321
+
+# content_type_id -> {"app_label", "model", "model_class", "url_template"}
+_content_type_info = {}
+_content_type_lock = threading.Lock()
+
+
+def get_content_type_info(content_type_id) -> dict:
+    """
+    Metadata of a content type, computed once per process: its app label,
+    model name, model class and the template of its detail URL
+    ("<app_label>-<model>-detail"), None when there is no such view.
+    """
+    info = _content_type_info.get(content_type_id)
+    if info is not None:
+        return info
+
+    content_type = ContentType.objects.get_for_id(content_type_id)
+    view_name = f"{content_type.app_label}-{content_type.model}-detail"
+    try:
+        url_template = reverse(view_name, kwargs={"pk": _URL_PK_SENTINEL}).replace(str(_URL_PK_SENTINEL), "{pk}")
+    except NoReverseMatch:
+        url_template = None
+    info = {
+        "app_label": content_type.app_label,
+        "model": content_type.model,
+        "model_class": content_type.model_class(),
+        "url_template": url_template,
+    }
+    with _content_type_lock:
+        _content_type_info[content_type_id] = info
+    return info
+
+
+def get_content_object_info(content_type_id, object_id) -> dict:
+    """Description of a generic reference as returned by the approval APIs, without loading the object."""
+    info = get_content_type_info(content_type_id)
+    return {
+        "content_type": {
+            "app_label": info["app_label"],
+            "model": info["model"],
+        },
+        "object_id": object_id,
+        "url": info["url_template"].format(pk=object_id) if info["url_template"] else None,
+    }
+
+
+def bulk_resolve_generic_objects(references) -> dict:
+    """
+    Load the objects behind (content_type_id, object_id) pairs with one
+    in_bulk query per content type. Returns {(content_type_id, object_id): obj};
+    missing objects and stale content types are left out. Soft-deleted rows
+    are included, like GenericForeignKey does.
+    """
+    object_ids = {}
+    for content_type_id, object_id in references:
+        object_ids.setdefault(content_type_id, set()).add(object_id)
+
+    objects = {}
+    for content_type_id, ids in object_ids.items():
+        model = get_content_type_info(content_type_id)["model_class"]
+        if model is None:
+            continue
+        for pk, obj in model._base_manager.in_bulk(ids).items():
+            objects[(content_type_id, pk)] = obj
+    return objects
+
+
+def prefetch_generic_foreign_key(instances, field_name="content_object") -> dict:
+    """
+    Resolve a GenericForeignKey across a page of instances in one query per
+    content type and cache the result on each instance, so reading the
+    field afterwards does not query. Returns the objects as
+    bulk_resolve_generic_objects does.
+    """
+    instances = list(instances)
+    if not instances:
+        return {}
+    field = instances[0]._meta.get_field(field_name)
+    ct_attname = instances[0]._meta.get_field(field.ct_field).attname
+
+    def reference(instance):
+        return getattr(instance, ct_attname), getattr(instance, field.fk_field)
+
+    objects = bulk_resolve_generic_objects(reference(instance) for instance in instances)
+    for instance in instances:
+        field.set_cached_value(instance, objects.get(reference(instance)))
+    return objects
@@ -1,7 +1,167 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
     page_size = 10
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a unique ordering such as ("-created_at", "-id").
+
+    Every page is a single range scan on the ordering columns: there is no
+    OFFSET and no COUNT query, so deep pages cost the same as the first one.
+    The last ordering field must be unique (normally the primary key).
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = tuple(ordering)
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        direction, values = self.decode_cursor(request)
+        reverse = direction == "previous"
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if values is not None:
+            queryset = self.apply_cursor(queryset, values, reverse)
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = rows
+        return rows
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering)
+
+    def keyset_q(self, values, reverse=False):
+        """Q object selecting the rows that come after `values` in the ordering."""
+        q = Q()
+        for i, field in enumerate(self.ordering):
+            descending = field.startswith("-") != reverse
+            clause = Q(**{f"{field.lstrip('-')}__{'lt' if descending else 'gt'}": values[i]})
+            for previous_field, previous_value in zip(self.ordering[:i], values[:i]):
+                clause &= Q(**{previous_field.lstrip("-"): previous_value})
+            q |= clause
+        return q
+
+    def row_is_after(self, row, values, reverse=False) -> bool:
+        """Python equivalent of keyset_q for rows that are not in the database."""
+        for field, value in zip(self.ordering, values):
+            current = self.get_row_value(row, field.lstrip("-"))
+            if current == value:
+                continue
+            descending = field.startswith("-") != reverse
+            return current < value if descending else current > value
+        return False
+
+    def apply_cursor(self, queryset, values, reverse):
+        # Objects that are not plain querysets can implement their own keyset filtering
+        if hasattr(queryset, "apply_keyset"):
+            return queryset.apply_keyset(
+                self.keyset_q(values, reverse),
+                lambda row: self.row_is_after(row, values, reverse),
+                cursor=dict(zip((field.lstrip("-") for field in self.ordering), values)),
+            )
+        return queryset.filter(self.keyset_q(values, reverse))
+
+    def get_row_value(self, row, name):
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    def encode_cursor(self, direction, row):
+        values = []
+        for field in self.ordering:
+            value = self.get_row_value(row, field.lstrip("-"))
+            if isinstance(value, datetime):
+                values.append(["dt", value.isoformat()])
+            else:
+                values.append(["v", value])
+        payload = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return "next", None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            direction = payload["d"]
+            values = [parse_datetime(value) if kind == "dt" else value for kind, value in payload["v"]]
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if direction not in ("next", "previous") or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return direction, values
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor("next", self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor("previous", self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }